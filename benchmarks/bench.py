@@ -0,0 +1,301 @@
+"""
+Benchmark suite for ProxyCardsTool (synthetic inputs, no network, no user profile touched).
+
+    python benchmarks/bench.py [--quick] [--only save_png,a4,crop_marks,local_index,fetchers]
+                               [--latency-ms 40] [--fixtures DIR] [--out results.json]
+    python benchmarks/bench.py --compare old.json new.json
+
+Fetchers run against replay_server.py: with --fixtures the recorded responses are
+used, otherwise a synthetic set (Scryfall, YGOPRODeck, dotgg, PKMNCards) is generated.
+Results are written as JSON so runs of different versions can be compared.
+"""
+import os, sys, json, time, shutil, platform, statistics, subprocess, tempfile, urllib.parse
+from typing import Callable, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__)); ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT); sys.path.insert(0, HERE)
+import main
+from replay_server import Fixtures, ReplayServer, synthetic_image
+
+RESULTS: List[dict] = []
+
+def measure(fn: Callable[[], object], runs: int, warmup: int = 1, setup: Optional[Callable[[], None]] = None) -> dict:
+    """Median/min/max wall time of fn() in ms; setup() runs untimed before every call."""
+    for _ in range(warmup):
+        if setup: setup()
+        fn()
+    times = []
+    for _ in range(runs):
+        if setup: setup()
+        t = time.perf_counter(); fn(); times.append((time.perf_counter() - t) * 1000)
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3),
+            "max_ms": round(max(times), 3), "runs": runs}
+
+def record(name: str, case: str, res: dict, **extra) -> None:
+    row = {"name": name, "case": case}; row.update(res); row.update(extra); RESULTS.append(row)
+    more = "".join(f", {k}={v}" for k, v in extra.items())
+    print(f"{name:<14} {case:<28} median {res['median_ms']:>10.2f} ms{more}")
+
+def isolate(tmp: str) -> None:
+    """Keep the app away from ~/mg_pcm_profiles: no disk cache, temporary indexes."""
+    main.CACHE.configure(enabled=False)
+    main.LOCAL_INDEX_DIR = os.path.join(tmp, "local_index")
+    main.OP_VARIANTS = main.KnownVariants(os.path.join(tmp, "op_variants.json"))
+    main.YGO_INDEX = main.YgoIndex(os.path.join(tmp, "no_ygo.sqlite"))
+    main.MTG_INDEX = main.MtgIndex(os.path.join(tmp, "no_mtg.sqlite"))
+
+# -------- Image pipeline --------
+def bench_save_png(tmp: str, quick: bool) -> None:
+    src = synthetic_image(745, 1040, "JPEG", "save_png")
+    small = synthetic_image(488, 680, "JPEG", "save_png_small")
+    out = os.path.join(tmp, "card.png"); runs = 3 if quick else 10
+    cases = [("plain", src, dict(add_border=False)),
+             ("border", src, dict(add_border=True, border_px=50)),
+             ("upscale", small, dict(add_border=False, do_upscale=True, min_height_px=1500)),
+             ("upscale+border", small, dict(add_border=True, border_px=50, do_upscale=True, min_height_px=1500))]
+    for case, data, kw in cases:
+        res = measure(lambda: main.save_png(data, out, dpi=300, **kw), runs)
+        record("save_png", case, res, out_kb=round(os.path.getsize(out) / 1024, 1))
+    photo = photo_like(745, 1040)
+    for profile in main.PNG_PROFILES:
+        res = measure(lambda: main.save_png(photo, out, add_border=True, border_px=50, dpi=300, profile=profile), runs)
+        record("save_png", f"profile {profile}", res, out_kb=round(os.path.getsize(out) / 1024, 1))
+
+def photo_like(w: int, h: int) -> bytes:
+    """JPEG with grain and gradients, closer to scanned card art than the flat synthetic cards."""
+    from PIL import Image
+    from io import BytesIO
+    noise = Image.merge("RGB", [Image.effect_noise((w, h), s).convert("L") for s in (40, 55, 70)])
+    im = Image.blend(Image.open(BytesIO(synthetic_image(w, h, "PNG", "photo"))).convert("RGB"), noise, 0.35)
+    buf = BytesIO(); im.save(buf, "JPEG", quality=90); return buf.getvalue()
+
+def _a4_layout(dpi: int) -> dict:
+    return dict(dpi=dpi, card_w_mm=63, card_h_mm=88, margin_x_mm=7, margin_y_mm=13, gap_x_mm=3, gap_y_mm=3,
+                crop_marks=True, crop_len_mm=5, crop_gap_mm=0, crop_stroke_px=1, crop_color=(0, 0, 0))
+
+def bench_a4(tmp: str, quick: bool) -> None:
+    cards = [synthetic_image(745, 1040, "JPEG", f"a4-{i}") for i in range(6)]
+    images = [cards[i % 6] for i in range(18)]     # 2 pages, repeated cards like multiply=on
+    for dpi in (300, 600):
+        def run():
+            for page in main.build_a4_pages(images, **_a4_layout(dpi)): page.close()
+        record("a4_pages", f"{dpi}dpi crop marks, 2 pages", measure(run, 2 if quick else 5))
+    for dpi in (300, 600):
+        for fmt in ("PDF", "PDF (raster)"):
+            out: List[str] = []
+            def run():
+                for p in out: os.remove(p)
+                out[:] = main.export_a4_sheets(images, _a4_layout(dpi), fmt, tmp, "bench")
+            res = measure(run, 2 if quick else 5)
+            record("a4_pdf", f"{dpi}dpi {'vector' if fmt == 'PDF' else 'raster'}, 2 pages", res, out_kb=round(os.path.getsize(out[0]) / 1024, 1))
+    for band_mb in (0, 16):   # 600 DPI page ≈ 72 MB RGB: whole page vs. 16 MB bands
+        out = []
+        def run():
+            for p in out: os.remove(p)
+            out[:] = main.export_a4_sheets(images, _a4_layout(600), "PNG", tmp, "bench", png_profile="fast",
+                                           band_mb=band_mb)
+        record("a4_png", f"600dpi {'bands 16 MB' if band_mb else 'whole page'}, 2 pages", measure(run, 2 if quick else 5),
+               out_kb=round(sum(os.path.getsize(p) for p in out) / 1024, 1))
+    # Bands resize only their rows (Image.resize box); Pillow's float box math rounds a few
+    # pixels differently from the whole-card resize, so bands may differ by 1 but never more.
+    photos = [photo_like(745, 1040) for _ in range(3)]
+    diff = max(a4_band_diff(photos, dpi, 64) for dpi in (300, 600))
+    assert diff <= 1, f"A4 bands differ from whole pages by {diff}/255"
+
+def a4_band_diff(images: List[bytes], dpi: int, band_px: int) -> int:
+    """Largest per-channel difference between a page composed in bands and the same page composed whole."""
+    from PIL import Image, ImageChops
+    page = next(main.iter_a4_pages(images, **_a4_layout(dpi)))
+    w, h, bands = next(main.iter_a4_bands(images, band_px=band_px, **_a4_layout(dpi)))
+    banded = Image.new("RGB", (w, h))
+    for y, band in bands: banded.paste(band, (0, y))
+    return max(hi for _, hi in ImageChops.difference(page, banded).getextrema())
+
+def bench_crop_marks(tmp: str, quick: bool) -> None:
+    from PIL import Image, ImageDraw
+    dpi = 300; page = Image.new("RGB", (main.mm_to_px(210, dpi), main.mm_to_px(297, dpi)), "white")
+    draw = ImageDraw.Draw(page); cw, ch = main.mm_to_px(63, dpi), main.mm_to_px(88, dpi)
+    ln, gap = main.mm_to_px(5, dpi), main.mm_to_px(0, dpi)
+    def run():
+        for i in range(9):
+            x = 80 + (i % 3) * (cw + 35); y = 150 + (i // 3) * (ch + 35)
+            main.draw_crop_marks(draw, x, y, cw, ch, ln, gap, 1, color=(0, 0, 0))
+    record("crop_marks", "9 cards @300dpi", measure(run, 20 if quick else 200))
+    slots = [(80 + (i % 3) * (cw + 35), 150 + (i // 3) * (ch + 35)) for i in range(9)]
+    def run_boxes():
+        for box in main.crop_mark_boxes(cw, ch, slots, ln, gap, 1): draw.rectangle(box, fill=(0, 0, 0))
+    record("crop_marks", "9 cards @300dpi, precomputed boxes", measure(run_boxes, 20 if quick else 200))
+
+# -------- Local search --------
+NAMES = ["Pikachu", "Charizard ex", "Dark Magician", "Lightning Bolt", "Blue-Eyes White Dragon", "Sol Ring",
+         "Mewtwo V", "Monkey D Luffy", "Roronoa Zoro", "Counterspell", "Black Lotus", "Gengar"]
+
+def make_tree(root: str, n_files: int) -> List[str]:
+    """n_files empty images in n_files/100 folders: One Piece codes and card names; returns lookup terms."""
+    terms: List[str] = []
+    per_dir = 100
+    for d in range(max(1, n_files // per_dir)):
+        folder = os.path.join(root, f"set{d // 20:03d}", f"box{d:04d}"); os.makedirs(folder, exist_ok=True)
+        for i in range(per_dir):
+            k = d * per_dir + i
+            if k % 2: name = f"OP{(k // 1000) % 12 + 1:02d}-{k % 1000:03d}" + (f"_p{k % 3}" if k % 5 == 0 else "")
+            else: name = f"{NAMES[(k // 2) % len(NAMES)]} {k:06d}"
+            open(os.path.join(folder, name + (".png", ".jpg", ".webp")[k % 3]), "wb").close()
+            if k % 50 == 1: terms.append(name.split("_")[0])
+    return terms + NAMES
+
+def bench_local_index(tmp: str, quick: bool) -> None:
+    n = 5000 if quick else 50000
+    root = os.path.join(tmp, f"tree_{n}")
+    t = time.perf_counter(); terms = make_tree(root, n)
+    print(f"(generated {n} files in {time.perf_counter() - t:.1f} s)")
+    idx = main.LocalIndex(root)
+    record("local_index", f"build {n} files", measure(lambda: idx.refresh(rebuild=True), 1 if quick else 3, warmup=0))
+    record("local_index", f"refresh unchanged {n}", measure(lambda: idx.refresh(), 3 if quick else 10))
+    main._LOCAL_INDEXES.clear(); main.local_index_for(root)
+    hits = [0]
+    def lookups():
+        hits[0] = sum(1 for term in terms if main.candidates_local_by_code_or_name(term, root))
+    res = measure(lookups, 3 if quick else 10)
+    per = round(res["median_ms"] / len(terms) * 1000, 2)
+    record("local_index", f"lookup x{len(terms)}", res, per_lookup_us=per, terms_found=hits[0])
+
+# -------- Fetchers (replay server) --------
+def synthetic_fixtures(root: str) -> Fixtures:
+    """Responses shaped like the real sources for a few popular cards."""
+    fx = Fixtures(root)
+    # Scryfall: 30 prints, full PNG + small JPEG
+    prints = []
+    for i in range(30):
+        png = f"https://cards.scryfall.io/png/front/0/{i}/bolt{i}.png"; sm = f"https://cards.scryfall.io/small/front/0/{i}/bolt{i}.jpg"
+        fx.add(png, image=[745, 1040, "PNG"]); fx.add(sm, image=[146, 204, "JPEG"])
+        prints.append({"name": "Lightning Bolt", "lang": "en", "released_at": f"20{10 + i % 15}-01-01",
+                       "image_uris": {"png": png, "large": png, "normal": png, "small": sm}})
+    q = urllib.parse.urlencode({"q": '!"Lightning Bolt" include:extras', "unique": "prints", "order": "released"})
+    fx.add(f"{main.SCRYFALL_SEARCH}?{q}", 200, {"Content-Type": "application/json"},
+           json.dumps({"object": "list", "has_more": False, "data": prints}).encode())
+    # YGOPRODeck: one card, 3 artworks, card page with 2 variant artworks
+    imgs = []
+    for i, cid in enumerate((46986414, 38033121, 46986415)):
+        full = f"https://images.ygoprodeck.com/images/cards/{cid}.jpg"; sm = f"https://images.ygoprodeck.com/images/cards_small/{cid}.jpg"
+        fx.add(full, image=[421, 614, "JPEG"]); fx.add(sm, image=[168, 246, "JPEG"])
+        imgs.append({"id": cid, "image_url": full, "image_url_small": sm})
+    fx.add(f"{main.YGOPRODECK_API}?name=Dark+Magician", 200, {"Content-Type": "application/json"},
+           json.dumps({"data": [{"id": 46986414, "name": "Dark Magician", "card_images": imgs}]}).encode())
+    tags = ""
+    for i in range(2):
+        url = f"https://images.ygoprodeck.com/images/cards/variant{i}.jpg"; fx.add(url, image=[421, 614, "JPEG"])
+        tags += f'<img class="variant-artwork lazy" data-src="{url}">\n'
+    fx.add("https://ygoprodeck.com/card/dark-magician-46986414", 200, {"Content-Type": "text/html"},
+           f"<html><body>{tags}</body></html>".encode())
+    # PKMNCards: search grid with 24 thumbnails
+    links = ""
+    for i in range(24):
+        full = f"https://pkmncards.com/wp-content/uploads/pikachu-set{i:02d}-{i + 1}.jpg"
+        thumb = full[:-4] + "-150x210.jpg"
+        fx.add(full, image=[734, 1024, "JPEG"]); fx.add(thumb, image=[150, 210, "JPEG"])
+        links += f'<a href="https://pkmncards.com/card/pikachu-{i}/" class="entry-title-link"><img src="{thumb}"></a>\n'
+    fx.add(main.PKMNCARDS_SEARCH + "pikachu", 200, {"Content-Type": "text/html"}, f"<html>{links}</html>".encode())
+    # dotgg: base art + 2 parallels exist, every other variant is a 404
+    for suffix in ("", "_p1", "_p2"):
+        fx.add(f"{main.DOTGG_BASE}OP01-001{suffix}.webp", image=[600, 838, "WEBP"])
+    fx.save()
+    return fx
+
+class Rerouted:
+    """Points the app's HTTP layers (requests session and async engine) at the replay server."""
+    def __init__(self, base: str): self.base = base
+
+    def rewrite(self, url: str) -> str:
+        p = urllib.parse.urlsplit(url)
+        return f"{self.base}/{p.netloc}{p.path or '/'}" + (f"?{p.query}" if p.query else "")
+
+    def __enter__(self):
+        get, fetch_many = main.SESSION.get, main.ENGINE.fetch_many
+        main.SESSION.get = lambda url, *a, **k: get(self.rewrite(url), *a, **k)
+        main.ENGINE.fetch_many = lambda urls, *a, **k: fetch_many([self.rewrite(u) for u in urls], *a, **k)
+        return self
+
+    def __exit__(self, *exc):
+        del main.SESSION.get, main.ENGINE.fetch_many
+
+def bench_fetchers(tmp: str, quick: bool, latency_ms: float, fixtures_dir: Optional[str]) -> None:
+    fx = Fixtures(fixtures_dir) if fixtures_dir else synthetic_fixtures(os.path.join(tmp, "fixtures"))
+    srv = ReplayServer(fx, latency_ms).start(); runs = 2 if quick else 5
+    def fresh():
+        srv.reset_counters()
+        main.OP_VARIANTS = main.KnownVariants(os.path.join(tmp, f"op_variants_{time.time_ns()}.json"))
+    cases = [
+        ("mtg", "Lightning Bolt", "MTG", "scryfall"),
+        ("ygo", "Dark Magician", "Yu-Gi-Oh!", "ygoprodeck"),
+        ("pokemon", "pikachu", "Pokémon", "pkmncards"),
+        ("onepiece", "OP01-001", "One Piece", "dotgg"),
+    ]
+    try:
+        with Rerouted(srv.base):
+            for name, term, game, source in cases:
+                res = measure(lambda: main._download_card_default(game, term, source, None), runs, setup=fresh)
+                record(f"fetch_{name}", f"default @{latency_ms:g}ms", res, requests=srv.requests,
+                       kb=round(srv.bytes_out / 1024, 1))
+                shown = [0]
+                def picker():
+                    # What the art picker does: list the candidates, then load every preview.
+                    cands = main.probe_all_arts(game, term, source); got = []
+                    main.load_previews(cands, lambda i, b, drop: got.append((b, drop))).shutdown(wait=True)
+                    shown[0] = sum(1 for b, drop in got if b) - len({d for _b, d in got if d is not None})
+                res = measure(picker, runs, setup=fresh)
+                record(f"fetch_{name}", f"picker @{latency_ms:g}ms", res, images=shown[0], requests=srv.requests,
+                       kb=round(srv.bytes_out / 1024, 1))
+    finally:
+        srv.stop()
+
+# -------- Runner --------
+def compare(old_path: str, new_path: str) -> int:
+    with open(old_path, "r", encoding="utf-8") as f: old = {(r["name"], r["case"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f: new = json.load(f)["results"]
+    print(f"{'benchmark':<42} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for r in new:
+        o = old.get((r["name"], r["case"]))
+        if not o: continue
+        ratio = r["median_ms"] / o["median_ms"] if o["median_ms"] else float("inf")
+        print(f"{r['name'] + ' ' + r['case']:<42} {o['median_ms']:>10.2f} {r['median_ms']:>10.2f} {ratio:>6.2f}x")
+    return 0
+
+def meta(args) -> dict:
+    import PIL
+    try: commit = subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception: commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "pillow": PIL.__version__, "platform": platform.platform(), "cpus": os.cpu_count(),
+            "quick": args.quick, "latency_ms": args.latency_ms}
+
+def run(argv: List[str]) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(prog="bench.py", description="ProxyCardsTool benchmarks")
+    ap.add_argument("--quick", action="store_true", help="fewer runs, 5k-file tree")
+    ap.add_argument("--only", help="comma list of: save_png, a4, crop_marks, local_index, fetchers")
+    ap.add_argument("--latency-ms", type=float, default=40.0, help="replay server delay per request")
+    ap.add_argument("--fixtures", help="recorded fixtures folder (default: synthetic)")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = ap.parse_args(argv)
+    if args.compare: return compare(*args.compare)
+
+    only = set((args.only or "save_png,a4,crop_marks,local_index,fetchers").split(","))
+    tmp = tempfile.mkdtemp(prefix="pct_bench_")
+    try:
+        isolate(tmp)
+        if "save_png" in only: bench_save_png(tmp, args.quick)
+        if "a4" in only: bench_a4(tmp, args.quick)
+        if "crop_marks" in only: bench_crop_marks(tmp, args.quick)
+        if "local_index" in only: bench_local_index(tmp, args.quick)
+        if "fetchers" in only: bench_fetchers(tmp, args.quick, args.latency_ms, args.fixtures)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta(args), "results": RESULTS}, f, indent=2)
+    print(f"Results written to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
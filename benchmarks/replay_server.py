@@ -0,0 +1,160 @@
+"""
+Local stand-in for the card sources (Scryfall, YGOPRODeck, dotgg, PKMNCards …).
+
+Serves recorded responses from a fixtures folder (index.json + body files) with a
+fixed delay per request, so the fetcher benchmarks run offline and reproducibly.
+
+    python benchmarks/replay_server.py serve  --fixtures DIR [--port 8799] [--latency-ms 40]
+    python benchmarks/replay_server.py record --fixtures DIR URL [URL …]
+
+Requests are addressed as /<host>/<path>?<query>, e.g.
+http://127.0.0.1:8799/api.scryfall.com/cards/search?q=… – bench.py rewrites the
+app's https URLs to this form. Unknown keys answer 404 (like missing variants).
+"""
+import os, sys, json, time, hashlib, threading, urllib.parse, http.server
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+def fixture_key(host: str, path: str, query: str = "") -> str:
+    """host + path + sorted query: the same request always maps to the same entry."""
+    q = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(query, keep_blank_values=True)))
+    return f"{host.lower()}{path or '/'}" + (f"?{q}" if q else "")
+
+def key_for_url(url: str) -> str:
+    p = urllib.parse.urlsplit(url)
+    return fixture_key(p.netloc, p.path, p.query)
+
+def synthetic_image(w: int, h: int, fmt: str, seed: str) -> bytes:
+    """Deterministic card-like picture (gradient, frame, art box, text lines) in the given format."""
+    from PIL import Image, ImageDraw, features
+    d = hashlib.sha1(seed.encode()).digest()
+    base = (d[0], d[1], d[2])
+    im = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    im = Image.blend(im, Image.new("RGB", (w, h), base), 0.6)
+    dr = ImageDraw.Draw(im)
+    m = max(2, w // 25)
+    dr.rectangle([0, 0, w - 1, h - 1], outline=(20, 20, 20), width=m)
+    dr.rectangle([2 * m, int(h * 0.12), w - 2 * m, int(h * 0.55)], fill=(d[3], d[4], d[5]))
+    for i in range(8):
+        y = int(h * 0.62) + i * max(3, h // 40)
+        dr.line([(2 * m, y), (w - 2 * m - (d[6 + i] % (w // 3 + 1)), y)], fill=(30, 30, 30), width=max(1, h // 200))
+    fmt = fmt.upper()
+    if fmt == "WEBP" and not features.check("webp"): fmt = "PNG"
+    buf = BytesIO()
+    im.save(buf, "JPEG" if fmt in ("JPG", "JPEG") else fmt, **({"quality": 90} if fmt in ("JPG", "JPEG", "WEBP") else {}))
+    return buf.getvalue()
+
+_CTYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "JPG": "image/jpeg", "WEBP": "image/webp"}
+
+class Fixtures:
+    """
+    index.json maps fixture_key → {"status", "headers", "body": file} or, for generated
+    pictures, {"image": [w, h, fmt]}. Bodies live next to the index (named by sha1).
+    """
+    def __init__(self, root: str):
+        self.root = root; self._lock = threading.Lock(); self._images: Dict[str, bytes] = {}
+        try:
+            with open(os.path.join(root, "index.json"), "r", encoding="utf-8") as f: self.index = json.load(f)
+        except FileNotFoundError:
+            self.index = {}
+
+    def get(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        e = self.index.get(key)
+        if e is None: return None
+        headers = dict(e.get("headers") or {})
+        if "image" in e:
+            w, h, fmt = e["image"]
+            with self._lock:
+                body = self._images.get(key)
+                if body is None: body = self._images[key] = synthetic_image(w, h, fmt, key)
+            headers.setdefault("Content-Type", _CTYPES.get(fmt.upper(), "application/octet-stream"))
+            return e.get("status", 200), headers, body
+        body = b""
+        if e.get("body"):
+            with open(os.path.join(self.root, e["body"]), "rb") as f: body = f.read()
+        return e.get("status", 200), headers, body
+
+    def add(self, url: str, status: int = 200, headers: Optional[Dict[str, str]] = None,
+            body: Optional[bytes] = None, image: Optional[list] = None) -> None:
+        e: dict = {"status": status, "headers": dict(headers or {})}
+        if image is not None: e["image"] = list(image)
+        elif body is not None:
+            name = hashlib.sha1(body).hexdigest() + ".bin"
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, name), "wb") as f: f.write(body)
+            e["body"] = name
+        self.index[key_for_url(url)] = e
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+
+class ReplayServer:
+    """Threaded HTTP/1.1 server (keep-alive) answering from Fixtures after latency_ms."""
+    def __init__(self, fixtures: Fixtures, latency_ms: float = 0.0, port: int = 0):
+        self.fixtures = fixtures; self.latency = latency_ms / 1000.0
+        self.requests = 0; self.bytes_out = 0; self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def log_message(self, *a): pass
+
+            def _answer(self, with_body: bool):
+                if server.latency: time.sleep(server.latency)
+                p = urllib.parse.urlsplit(self.path)
+                host, _, path = p.path.lstrip("/").partition("/")
+                hit = server.fixtures.get(fixture_key(host, "/" + path, p.query))
+                status, headers, body = hit if hit else (404, {"Content-Type": "text/plain"}, b"not recorded")
+                self.send_response(status)
+                for k, v in headers.items():
+                    if k.lower() not in ("content-length", "transfer-encoding", "content-encoding", "connection"):
+                        self.send_header(k, v)
+                with server._lock:   # counted before the answer goes out, so callers see it on return
+                    server.requests += 1; server.bytes_out += len(body) if with_body else 0
+                self.send_header("Content-Length", str(len(body))); self.end_headers()
+                if with_body: self.wfile.write(body)
+
+            def do_GET(self): self._answer(True)
+            def do_HEAD(self): self._answer(False)
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown(); self.httpd.server_close()
+
+    def reset_counters(self) -> None:
+        with self._lock: self.requests = 0; self.bytes_out = 0
+
+def record(fixtures_dir: str, urls: List[str]) -> None:
+    """Fetch real responses once and store them as fixtures."""
+    import requests
+    fx = Fixtures(fixtures_dir)
+    for url in urls:
+        r = requests.get(url, timeout=30, headers={"User-Agent": "ProxyCardsTool-bench/1.0"})
+        keep = {k: v for k, v in r.headers.items() if k.lower() in ("content-type", "etag", "last-modified", "cache-control")}
+        fx.add(url, r.status_code, keep, r.content)
+        print(f"{r.status_code} {len(r.content):>9} B  {url}")
+    fx.save()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Replay server for the ProxyCardsTool benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("serve"); sp.add_argument("--fixtures", required=True)
+    sp.add_argument("--port", type=int, default=8799); sp.add_argument("--latency-ms", type=float, default=0.0)
+    rp = sub.add_parser("record"); rp.add_argument("--fixtures", required=True); rp.add_argument("urls", nargs="+")
+    args = ap.parse_args()
+    if args.cmd == "record":
+        record(args.fixtures, args.urls); sys.exit(0)
+    srv = ReplayServer(Fixtures(args.fixtures), args.latency_ms, args.port)
+    print(f"Serving {len(srv.fixtures.index)} fixture(s) on {srv.base} (latency {args.latency_ms:g} ms)")
+    try: srv.httpd.serve_forever()
+    except KeyboardInterrupt: pass
@@ -1,11 +1,13 @@
 # main_multi_game_fixed10.py
-import os, re, math, sys, html
-from typing import Optional, List, Tuple, Dict
+import os, re, math, sys, html, time, hashlib, threading, atexit, bisect, itertools
+import asyncio, ssl, zlib, struct, urllib.parse, gzip, sqlite3, unicodedata, difflib, queue
+from typing import Optional, List, Tuple, Dict, Iterator, Iterable, Callable
 from io import BytesIO
+from contextlib import contextmanager
 from tkinter import (
     Tk, Label, Button, Text, Scrollbar, filedialog, messagebox,
     Entry, StringVar, END, BooleanVar, Toplevel, Canvas, Frame,
-    IntVar, Radiobutton, DISABLED, NORMAL, LabelFrame, Checkbutton, OptionMenu
+    IntVar, Radiobutton, DISABLED, NORMAL, LabelFrame, Checkbutton, OptionMenu, PhotoImage
 )
 
 import requests
@@ -14,8 +16,8 @@ import json
 import glob
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PIL import Image, ImageTk, ImageOps, ImageFilter, Image as PILImage, ImageDraw
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, Future
+from PIL import Image, ImageTk, ImageOps, ImageFilter, Image as PILImage, ImageDraw, ImageColor, ImageChops
 
 DOTGG_BASE = "https://static.dotgg.gg/onepiece/card/"
 LIMITLESS_BASE = "https://limitlesstcg.nyc3.cdn.digitaloceanspaces.com/one-piece/"
@@ -25,6 +27,10 @@ SCRYFALL_SEARCH = "https://api.scryfall.com/cards/search"
 PKMNCARDS_SEARCH = "https://pkmncards.com/?s="
 
 MAX_PARALLEL, TIMEOUT_SEC = 16, 10
+LINE_WORKERS = 6
+RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+ENCODE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+BAND_MB = 128   # A4 pages whose RGB buffer is larger are rendered and written in bands of at most this size
 THUMB_W, THUMB_H, THUMB_COLS = 150, 210, 6
 P_MIN, P_MAX = 1, 10
 IMAGE_EXTS = {".png",".webp",".jpg",".jpeg",".bmp"}
@@ -48,37 +54,726 @@ def make_session() -> requests.Session:
     return s
 SESSION = make_session()
 
-def http_get(url: str, params: Optional[dict]=None) -> Optional[requests.Response]:
+# -------- Stage timing / trace --------
+class StageTrace:
+    """
+    Per-stage timings for a run (http, decode, resize, encode, write, card, page …).
+    Spans are recorded from any thread; summary() gives totals and percentiles and
+    write_chrome_trace() exports them for chrome://tracing / Perfetto. Runs are
+    refcounted like RUN_FLIGHT: the first begin() starts a fresh recording.
+    """
+    def __init__(self):
+        self._lock = threading.Lock(); self._runs = 0
+        self.events: List[tuple] = []; self.threads: Dict[int, str] = {}
+
+    def begin(self) -> None:
+        with self._lock:
+            if self._runs == 0: self.events = []; self.threads = {}
+            self._runs += 1
+
+    def end(self) -> None:
+        with self._lock: self._runs = max(0, self._runs - 1)
+
+    def add(self, stage: str, start: float, dur: float, args: Optional[dict] = None, lane: Optional[str] = None) -> None:
+        """start is a time.perf_counter() value (shared across processes of one machine);
+        lane names a pseudo-thread for overlapping spans recorded by one thread (async requests)."""
+        if lane is None: t = threading.current_thread(); tid, name = t.ident, t.name
+        else: tid = int(hashlib.md5(lane.encode()).hexdigest()[:7], 16); name = lane
+        ev = (stage, start, dur, os.getpid(), tid, args or None)
+        with self._lock:
+            self.events.append(ev)
+            if tid not in self.threads: self.threads[tid] = name
+
+    def merge(self, events: List[tuple], threads: Dict[int, str]) -> None:
+        """Add spans recorded in a worker process (see take())."""
+        with self._lock:
+            self.events.extend(events)
+            for tid, nm in threads.items(): self.threads.setdefault(tid, nm)
+
+    def take(self) -> Tuple[List[tuple], Dict[int, str]]:
+        with self._lock: ev, th = self.events, self.threads; self.events = []; self.threads = {}
+        return ev, th
+
+    @contextmanager
+    def span(self, stage: str, **args):
+        t = time.perf_counter()
+        try: yield
+        finally: self.add(stage, t, time.perf_counter() - t, args)
+
+    def summary(self) -> Dict[str, dict]:
+        """{stage: {count, total_sec, p50_ms, p90_ms, p99_ms, max_ms}}"""
+        by: Dict[str, List[float]] = {}
+        with self._lock:
+            for ev in self.events: by.setdefault(ev[0], []).append(ev[2])
+        out = {}
+        for stage, d in by.items():
+            d.sort(); pct = lambda q: round(d[min(len(d) - 1, int(q * len(d)))] * 1000, 1)
+            out[stage] = {"count": len(d), "total_sec": round(sum(d), 3),
+                          "p50_ms": pct(0.5), "p90_ms": pct(0.9), "p99_ms": pct(0.99), "max_ms": round(d[-1] * 1000, 1)}
+        return out
+
+    def write_chrome_trace(self, path: str) -> None:
+        with self._lock: events = list(self.events); threads = dict(self.threads)
+        t0 = min((ev[1] for ev in events), default=0.0)
+        pids = {(ev[4], ev[3]) for ev in events}
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": threads.get(tid, str(tid))}}
+               for tid, pid in pids]
+        for stage, start, dur, pid, tid, args in events:
+            e = {"name": stage, "cat": stage, "ph": "X", "ts": round((start - t0) * 1e6, 1),
+                 "dur": round(dur * 1e6, 1), "pid": pid, "tid": tid}
+            if args: e["args"] = {k: str(v) for k, v in args.items()}
+            out.append(e)
+        with open(path, "w", encoding="utf-8") as f: json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+
+TRACE = StageTrace()
+
+class _TimedFile:
+    """Write-only file for encoders: time spent in write() is reported as disk time."""
+    def __init__(self, path: str):
+        self._f = open(path, "wb"); self.sec = 0.0
+    def write(self, b) -> int:
+        t = time.perf_counter(); n = self._f.write(b); self.sec += time.perf_counter() - t; return n
+    def tell(self) -> int: return self._f.tell()
+    def seek(self, *a) -> int: return self._f.seek(*a)
+    def flush(self) -> None: self._f.flush()
+    def close(self) -> None:
+        t = time.perf_counter(); self._f.close(); self.sec += time.perf_counter() - t
+
+def save_image_timed(im: PILImage.Image, path: str, fmt: str, **params) -> None:
+    """im.save(path, …) with encoder time traced as "encode" and disk time as "write"."""
+    t = time.perf_counter(); f = _TimedFile(path)
+    try: im.save(f, fmt, **params)
+    finally: f.close()
+    total = time.perf_counter() - t; name = os.path.basename(path)
+    TRACE.add("encode", t, total - f.sec, {"file": name, "format": fmt})
+    TRACE.add("write", t + total - f.sec, f.sec, {"file": name})
+
+# -------- Disk cache (URL -> content-addressed bodies) --------
+SETTINGS_DIR = os.path.join(os.path.expanduser("~"), "mg_pcm_profiles")
+CACHE_DIR = os.path.join(SETTINGS_DIR, "http_cache")
+CACHE_MAX_MB = 2048
+CACHE_FRESH_IMAGE_SEC = 30 * 24 * 3600   # images are immutable in practice
+CACHE_FRESH_OTHER_SEC = 24 * 3600        # API/HTML answers: revalidate daily
+
+class DiskCache:
+    """
+    Persistent HTTP cache. The index maps the full request URL to metadata
+    (content hash, ETag/Last-Modified, last access); bodies live once per SHA-256
+    under blobs/, so the same image behind two URLs is stored only once.
+    Stale entries are revalidated with If-None-Match / If-Modified-Since.
+    """
+    def __init__(self, root: str, max_mb: int = CACHE_MAX_MB):
+        self.root = root; self.enabled = True
+        self.max_bytes = max(0, int(max_mb)) * 1024 * 1024
+        self.hits = self.revalidated = self.misses = 0
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    def configure(self, enabled: bool = True, max_mb: Optional[int] = None) -> None:
+        self.enabled = bool(enabled)
+        if max_mb is not None: self.max_bytes = max(0, int(max_mb)) * 1024 * 1024
+
+    def reset_stats(self) -> None:
+        with self._lock: self.hits = self.revalidated = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            idx = self._load()
+            size = sum({e["sha"]: e.get("n", 0) for e in idx.values()}.values())
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                    "entries": len(idx), "bytes": size}
+
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, "blobs", sha[:2], sha)
+
+    def _load(self) -> Dict[str, dict]:
+        if self._index is None:
+            try:
+                with open(self._index_path(), "r", encoding="utf-8") as f: self._index = json.load(f)
+            except Exception:
+                self._index = {}
+        return self._index
+
+    def lookup(self, key: str) -> Optional[dict]:
+        if not self.enabled: return None
+        with self._lock:
+            e = self._load().get(key)
+            return dict(e) if e else None
+
+    def is_fresh(self, entry: dict) -> bool:
+        ttl = CACHE_FRESH_IMAGE_SEC if str(entry.get("ct", "")).startswith("image/") else CACHE_FRESH_OTHER_SEC
+        return (time.time() - entry.get("t", 0)) < ttl
+
+    def validators(self, entry: dict) -> Dict[str, str]:
+        h = {}
+        if entry.get("etag"): h["If-None-Match"] = entry["etag"]
+        if entry.get("lm"): h["If-Modified-Since"] = entry["lm"]
+        return h
+
+    def read(self, key: str, entry: dict) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(entry["sha"]), "rb") as f: body = f.read()
+        except Exception:
+            with self._lock:
+                self._load().pop(key, None); self._dirty = True
+            return None
+        with self._lock:
+            e = self._load().get(key)
+            if e: e["a"] = time.time(); self._dirty = True
+        return body
+
+    def refresh(self, key: str, headers) -> None:
+        """Mark an entry fresh again after a 304 answer."""
+        with self._lock:
+            e = self._load().get(key)
+            if not e: return
+            e["t"] = e["a"] = time.time()
+            if headers.get("ETag"): e["etag"] = headers["ETag"]
+            if headers.get("Last-Modified"): e["lm"] = headers["Last-Modified"]
+            self._dirty = True
+
+    def store(self, key: str, body: bytes, headers) -> None:
+        if not self.enabled or not body or (self.max_bytes and len(body) > self.max_bytes): return
+        sha = hashlib.sha256(body).hexdigest(); path = self._blob_path(sha)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f: f.write(body)
+                os.replace(tmp, path)
+        except Exception:
+            return
+        now = time.time()
+        with self._lock:
+            self._load()[key] = {"sha": sha, "n": len(body), "t": now, "a": now,
+                                 "ct": headers.get("Content-Type", ""),
+                                 "etag": headers.get("ETag"), "lm": headers.get("Last-Modified")}
+            self._dirty = True
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        if not self.max_bytes: return
+        idx = self._load()
+        sizes = {e["sha"]: e.get("n", 0) for e in idx.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes: return
+        refs: Dict[str, int] = {}
+        for e in idx.values(): refs[e["sha"]] = refs.get(e["sha"], 0) + 1
+        for key in sorted(idx, key=lambda k: idx[k].get("a", 0)):
+            if total <= self.max_bytes: break
+            sha = idx.pop(key)["sha"]; refs[sha] -= 1
+            if refs[sha] == 0:
+                total -= sizes[sha]
+                try: os.remove(self._blob_path(sha))
+                except Exception: pass
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty or self._index is None: return
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                tmp = self._index_path() + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f: json.dump(self._index, f)
+                os.replace(tmp, self._index_path()); self._dirty = False
+            except Exception as e:
+                print(f"[WARN] cache index not saved: {e}")
+
+    def clear(self) -> None:
+        import shutil
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._index = {}; self._dirty = False
+
+CACHE = DiskCache(CACHE_DIR)
+atexit.register(CACHE.flush)
+
+def _cached_response(url: str, entry: dict, body: bytes) -> requests.Response:
+    r = requests.Response()
+    r.status_code = 200; r.url = url; r._content = body
+    r.headers["Content-Type"] = entry.get("ct", "")
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    return r
+
+def cached_get(url: str, params: Optional[dict]=None, headers: Optional[dict]=None) -> Optional[requests.Response]:
+    """GET through the disk cache; returns a 200 response (real or rebuilt from cache) or None."""
+    key = requests.Request("GET", url, params=params).prepare().url
+    entry = CACHE.lookup(key)
+    if entry and CACHE.is_fresh(entry):
+        body = CACHE.read(key, entry)
+        if body is not None:
+            with CACHE._lock: CACHE.hits += 1
+            return _cached_response(key, entry, body)
+        entry = None
+    hdrs = dict(headers or {})
+    if entry: hdrs.update(CACHE.validators(entry))
+    r = SESSION.get(key, timeout=TIMEOUT_SEC, headers=hdrs or None)
+    if r.status_code == 304 and entry:
+        body = CACHE.read(key, entry)
+        if body is not None:
+            CACHE.refresh(key, r.headers)
+            with CACHE._lock: CACHE.revalidated += 1
+            return _cached_response(key, entry, body)
+        r = SESSION.get(key, timeout=TIMEOUT_SEC, headers=headers)
+    if r.status_code != 200: return None
+    with CACHE._lock: CACHE.misses += 1
+    CACHE.store(key, r.content, r.headers)
+    return r
+
+# -------- Run-scoped request deduplication --------
+RUN_MEMO_MB = 256   # finished results kept for repeats within a run; the oldest go first
+
+def _result_size(res) -> int:
+    if isinstance(res, (bytes, bytearray)): return len(res)
+    return len(getattr(res, "content", None) or b"")   # requests.Response; lists etc. count as small
+
+class SingleFlight:
+    """
+    While a run is active, every key is computed once: callers arriving while the
+    call is in flight wait for it and share its result (or exception), later callers
+    get the finished result from a per-run memo. Failures and empty results are not
+    kept (the next caller retries), and the memo holds at most RUN_MEMO_MB of image
+    bytes and responses, dropping the oldest first. Outside a run, calls pass straight through.
+    """
+    def __init__(self):
+        self.active = False; self.saved = 0; self._runs = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[object, Future] = {}
+        self._done: Dict[object, Tuple[object, int]] = {}; self._done_bytes = 0
+
+    def _clear(self) -> None:
+        self._calls.clear(); self._done.clear(); self._done_bytes = 0
+
+    def begin(self) -> None:
+        """Start a run; runs that overlap (batch lists) share one scope until the last ends."""
+        with self._lock:
+            if self._runs == 0: self._clear(); self.saved = 0
+            self._runs += 1; self.active = True
+
+    def end(self) -> None:
+        with self._lock:
+            self._runs = max(0, self._runs - 1)
+            if self._runs == 0: self._clear(); self.active = False
+
+    def claim(self, key) -> Tuple[Future, bool]:
+        """(future, owner): the owner must resolve the future and release() it, everybody else waits on it."""
+        with self._lock:
+            if not self.active: return Future(), True
+            done = self._done.get(key)
+            if done is not None:
+                self.saved += 1; fut = Future(); fut.set_result(done[0]); return fut, False
+            fut = self._calls.get(key)
+            if fut is None:
+                fut = self._calls[key] = Future(); return fut, True
+            self.saved += 1
+            return fut, False
+
+    def release(self, key, fut: Future) -> None:
+        """Called by the owner once fut is resolved: successful results move to the run memo."""
+        with self._lock:
+            if self._calls.get(key) is not fut: return
+            del self._calls[key]
+            if not self.active or not fut.done() or fut.cancelled() or fut.exception() is not None: return
+            res = fut.result()
+            if not res: return                      # None, b"", [] or a failed Response: retry next time
+            size = _result_size(res); budget = RUN_MEMO_MB * 1048576
+            if size > budget: return
+            self._done[key] = (res, size); self._done_bytes += size
+            while self._done_bytes > budget:
+                oldest = next(iter(self._done)); self._done_bytes -= self._done.pop(oldest)[1]
+
+    def do(self, key, fn, *args, **kwargs):
+        fut, owner = self.claim(key)
+        if not owner: return fut.result()
+        try:
+            res = fn(*args, **kwargs)
+        except BaseException as e:
+            fut.set_exception(e); raise
+        else:
+            fut.set_result(res); return res
+        finally:
+            self.release(key, fut)
+
+RUN_FLIGHT = SingleFlight()
+
+def _params_key(params: Optional[dict]) -> tuple:
+    return tuple(sorted((params or {}).items()))
+
+def _http_get(url: str, params: Optional[dict]=None) -> Optional[requests.Response]:
     try:
-        r = SESSION.get(url, timeout=TIMEOUT_SEC, params=params)
-        if r.status_code == 200: return r
+        with TRACE.span("http", url=url): return cached_get(url, params=params)
     except Exception: pass
     return None
 
-def request_ok(url: str, params: Optional[dict]=None) -> Optional[bytes]:
-    r = http_get(url, params=params); return (r.content if r and r.content else None)
+def http_get(url: str, params: Optional[dict]=None) -> Optional[requests.Response]:
+    return RUN_FLIGHT.do(("GET", url, _params_key(params)), _http_get, url, params)
+
+# -------- Async fetch engine (image downloads) --------
+PER_HOST_CONNECTIONS = 8
+PKMN_HEADERS = {'Referer': 'https://pkmncards.com/'}
+
+class FetchResult:
+    __slots__ = ("url", "status", "headers", "content")
+    def __init__(self, url: str, status: int, headers, content: bytes):
+        self.url = url; self.status = status; self.headers = headers; self.content = content
+
+class _StaleConnection(Exception):
+    pass
+
+class FetchEngine:
+    """
+    Small HTTP/1.1 client on one asyncio event loop (running in a daemon thread).
+    Connections are kept alive and pooled per (scheme, host, port); a semaphore per
+    host caps parallel requests, so hundreds of downloads cost no threads at all.
+    fetch()/fetch_many() are the blocking facade for the rest of the program;
+    None means a transport error (callers fall back to SESSION), status 0 a
+    timeout (a retry through SESSION would only wait again). The timeout covers
+    connect and read only, not the wait for a free per-host slot.
+    """
+    def __init__(self, per_host: int = PER_HOST_CONNECTIONS, timeout: float = TIMEOUT_SEC):
+        self.per_host = per_host; self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        self._idle: Dict[tuple, list] = {}; self._sems: Dict[tuple, asyncio.Semaphore] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.bytes_in = 0
+        self._lanes: List[int] = []; self._lanes_all: List[int] = []   # trace lanes, loop thread only
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="fetch-engine", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def fetch_many(self, urls: List[str], headers: Optional[dict] = None, method: str = "GET",
+                   per_url_headers: Optional[List[dict]] = None) -> List[Optional[FetchResult]]:
+        if not urls: return []
+        loop = self._ensure_loop()
+        hdrs = [dict(headers or {}, **(per_url_headers[i] if per_url_headers else {})) for i in range(len(urls))]
+        async def run_all():
+            return await asyncio.gather(*(self._request_safe(u, h, method) for u, h in zip(urls, hdrs)))
+        return asyncio.run_coroutine_threadsafe(run_all(), loop).result()
+
+    def fetch(self, url: str, headers: Optional[dict] = None, method: str = "GET") -> Optional[FetchResult]:
+        return self.fetch_many([url], headers, method)[0]
+
+    async def _request_safe(self, url: str, headers: dict, method: str) -> Optional[FetchResult]:
+        # Concurrent requests are traced on separate lanes so they do not overlap in the trace.
+        lane = self._lanes.pop() if self._lanes else len(self._lanes_all)
+        if lane == len(self._lanes_all): self._lanes_all.append(lane)
+        t = time.perf_counter(); res = None
+        try:
+            for attempt in range(3):   # same policy as make_session(): 2 retries on 429/5xx
+                try:
+                    res = await self._request(url, headers, method)
+                except asyncio.TimeoutError:
+                    res = FetchResult(url, 0, {}, b""); return res
+                except Exception:
+                    res = None; return None
+                if res.status not in (429, 500, 502, 503, 504) or attempt == 2: return res
+                await asyncio.sleep(0.3 * (2 ** attempt))
+            return None
+        finally:
+            TRACE.add("http", t, time.perf_counter() - t, {"url": url, "method": method, "status": res.status if res else None},
+                      lane=f"fetch lane {lane}")
+            self._lanes.append(lane)
+
+    async def _request(self, url: str, headers: dict, method: str, redirects: int = 5) -> FetchResult:
+        parts = urllib.parse.urlsplit(url)
+        https = parts.scheme == "https"
+        host = parts.hostname or ""; port = parts.port or (443 if https else 80)
+        key = (parts.scheme, host, port)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_hdr = host if parts.port is None else f"{host}:{port}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host_hdr}",
+                 f"User-Agent: {SESSION.headers.get('User-Agent', '')}",
+                 f"Accept: {SESSION.headers.get('Accept', '*/*')}",
+                 "Accept-Encoding: gzip, deflate", "Connection: keep-alive"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        req = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        sem = self._sems.get(key)
+        if sem is None: sem = self._sems[key] = asyncio.Semaphore(self.per_host)
+        async with sem:      # the timeout starts once a slot is free
+            status, rheaders, body = await asyncio.wait_for(self._exchange(key, host, port, https, req, method),
+                                                            self.timeout)
+        self.bytes_in += len(body)
+        if status in (301, 302, 303, 307, 308) and rheaders.get("Location") and redirects > 0:
+            return await self._request(urllib.parse.urljoin(url, rheaders["Location"]), headers,
+                                       method if status in (307, 308) else ("HEAD" if method == "HEAD" else "GET"),
+                                       redirects - 1)
+        return FetchResult(url, status, rheaders, body)
+
+    async def _exchange(self, key: tuple, host: str, port: int, https: bool, req: bytes, method: str):
+        for fresh in (False, True):
+            conn = None if fresh else self._take_idle(key)
+            reused = conn is not None
+            if conn is None: conn = await self._connect(host, port, https)
+            reader, writer = conn
+            try:
+                writer.write(req); await writer.drain()
+                status, rheaders, body, keep = await self._read_response(reader, method)
+            except (_StaleConnection, ConnectionError, asyncio.IncompleteReadError, OSError):
+                writer.close()
+                if reused: continue      # server dropped an idle keep-alive connection
+                raise
+            except BaseException:
+                writer.close(); raise
+            if keep: self._idle.setdefault(key, []).append(conn)
+            else: writer.close()
+            return status, rheaders, body
+
+    def _take_idle(self, key: tuple):
+        pool = self._idle.get(key)
+        while pool:
+            reader, writer = pool.pop()
+            if not writer.is_closing() and not reader.at_eof(): return reader, writer
+        return None
+
+    async def _connect(self, host: str, port: int, https: bool):
+        ctx = None
+        if https:
+            if self._ssl is None: self._ssl = ssl.create_default_context(cafile=requests.certs.where())
+            ctx = self._ssl
+        return await asyncio.open_connection(host, port, ssl=ctx, server_hostname=host if https else None)
+
+    async def _read_response(self, reader: asyncio.StreamReader, method: str):
+        line = await reader.readline()
+        if not line: raise _StaleConnection()
+        m = re.match(rb"HTTP/(\d\.\d)\s+(\d{3})", line)
+        if not m: raise ConnectionError("bad status line")
+        version, status = m.group(1), int(m.group(2))
+        rheaders = requests.structures.CaseInsensitiveDict()
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""): break
+            k, _, v = h.decode("latin-1").partition(":")
+            k = k.strip(); v = v.strip()
+            rheaders[k] = f"{rheaders[k]}, {v}" if k in rheaders else v
+        conn_hdr = rheaders.get("Connection", "").lower()
+        keep = (version == b"1.1" and "close" not in conn_hdr) or "keep-alive" in conn_hdr
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in rheaders.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""): pass
+                    break
+                chunks.append(await reader.readexactly(size)); await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif rheaders.get("Content-Length") is not None:
+            body = await reader.readexactly(int(rheaders["Content-Length"]))
+        else:
+            body = await reader.read(); keep = False
+        enc = rheaders.get("Content-Encoding", "").lower()
+        if body and enc == "gzip": body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif body and enc == "deflate":
+            try: body = zlib.decompress(body)
+            except zlib.error: body = zlib.decompress(body, -zlib.MAX_WBITS)
+        return status, rheaders, body, keep
+
+ENGINE = FetchEngine()
 
-def request_ok_pkmn(url: str) -> Optional[bytes]:
-    """Download with Referer to avoid CDN anti-hotlink 1x1 thumbnails."""
+def fetch_bytes_many(urls: List[str], headers: Optional[dict] = None) -> List[Optional[bytes]]:
+    """
+    Download many URLs at once through ENGINE, the disk cache and the run-scoped
+    dedup layer. Results are aligned with urls (None = missing/failed).
+    """
+    tag = ("BYTES", tuple(sorted((headers or {}).items())))
+    results: List[Optional[bytes]] = [None] * len(urls)
+    waits: List[Tuple[int, Future]] = []; todo: List[Tuple[int, str, Optional[dict], Future]] = []
+    owned: List[Tuple[tuple, Future]] = []
     try:
-        r = SESSION.get(url, timeout=TIMEOUT_SEC, headers={'Referer': 'https://pkmncards.com/'})
-        if r.status_code == 200 and r.content:
-            return r.content
-    except Exception:
-        pass
-    return None
+        for i, url in enumerate(urls):
+            fut, owner = RUN_FLIGHT.claim(tag + (url,))
+            if not owner: waits.append((i, fut)); continue
+            owned.append((tag + (url,), fut))
+            try: url = requests.Request("GET", url).prepare().url   # same key as cached_get()
+            except Exception: results[i] = None; fut.set_result(None); continue
+            entry = CACHE.lookup(url)
+            if entry and CACHE.is_fresh(entry):
+                body = CACHE.read(url, entry)
+                if body is not None:
+                    with CACHE._lock: CACHE.hits += 1
+                    results[i] = body; fut.set_result(body); continue
+                entry = None
+            todo.append((i, url, entry, fut))
+        if todo:
+            try:
+                no_proxy = [not requests.utils.get_environ_proxies(u) for _i, u, _e, _f in todo]
+            except Exception:
+                no_proxy = [True] * len(todo)
+            direct = [t for t, ok in zip(todo, no_proxy) if ok]
+            resps = ENGINE.fetch_many([u for _i, u, _e, _f in direct], headers,
+                                      per_url_headers=[CACHE.validators(e) if e else {} for _i, _u, e, _f in direct])
+            by_idx = {t[0]: r for t, r in zip(direct, resps)}
+            for i, url, entry, fut in todo:
+                body = None
+                try:
+                    r = by_idx.get(i)
+                    if r is None:                       # proxy configured or transport error → requests
+                                                        # (status 0 = engine timeout: not retried)
+                        rr = cached_get(url, headers=headers)
+                        body = rr.content if rr is not None and rr.content else None
+                    elif r.status == 304 and entry:
+                        body = CACHE.read(url, entry)
+                        if body is not None:
+                            CACHE.refresh(url, r.headers)
+                            with CACHE._lock: CACHE.revalidated += 1
+                        else:
+                            rr = cached_get(url, headers=headers)
+                            body = rr.content if rr is not None and rr.content else None
+                    elif r.status == 200 and r.content:
+                        body = r.content
+                        with CACHE._lock: CACHE.misses += 1
+                        CACHE.store(url, body, r.headers)
+                except Exception:
+                    body = None
+                results[i] = body; fut.set_result(body)
+    finally:
+        for key, fut in owned:              # never leave a waiter hanging, whatever failed above
+            if not fut.done(): fut.set_result(None)
+            RUN_FLIGHT.release(key, fut)
+    for i, fut in waits:
+        try: results[i] = fut.result()
+        except Exception: results[i] = None
+    return results
+
+def request_ok(url: str, params: Optional[dict]=None) -> Optional[bytes]:
+    if params:
+        r = http_get(url, params=params); return (r.content if r and r.content else None)
+    return fetch_bytes_many([url])[0]
 
 # -------- Local file search (all games) --------
+LOCAL_INDEX_DIR = os.path.join(SETTINGS_DIR, "local_index")
+
+class LocalIndex:
+    """
+    Persistent listing of the image files below one root folder.
+    Every directory is stored with its mtime; refresh() re-lists only directories
+    whose mtime changed (adding, removing or renaming an entry touches its parent),
+    unchanged ones cost a single stat(). Lookups search one joined, upper-cased
+    name buffer with str.find, so a substring/code query never touches the disk.
+    """
+    def __init__(self, root: str):
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.dirs: Dict[str, dict] = {}   # rel dir -> {"m": mtime_ns, "d": [subdirs], "f": [image files]}
+        self.scan_sec = 0.0; self.dirs_read = 0
+        self._lock = threading.Lock()
+        # (name buffer, start offsets, paths, lookup memo): replaced as a whole, never mutated in
+        # place, so a lookup running during a refresh sees one consistent listing.
+        self._lookup: Tuple[str, List[int], List[str], Dict[str, List[str]]] = ("", [], [], {})
+        self._load()
+
+    def _file(self) -> str:
+        key = hashlib.sha1(os.path.normcase(self.root).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(LOCAL_INDEX_DIR, key + ".json")
+
+    def _load(self) -> None:
+        try:
+            with open(self._file(), "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("root") == self.root:
+                self.dirs = data.get("dirs", {}); self.scan_sec = float(data.get("scan_sec", 0.0))
+        except Exception:
+            self.dirs = {}
+        self._rebuild_lookup()
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(LOCAL_INDEX_DIR, exist_ok=True)
+            tmp = self._file() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"root": self.root, "scan_sec": self.scan_sec, "dirs": self.dirs}, f)
+            os.replace(tmp, self._file())
+        except Exception as e:
+            print(f"[WARN] local index not saved: {e}")
+
+    @property
+    def file_count(self) -> int:
+        return len(self._lookup[2])
+
+    def refresh(self, rebuild: bool = False) -> "LocalIndex":
+        """Bring the index up to date; rebuild=True re-lists every directory."""
+        with self._lock:
+            t0 = time.perf_counter(); new: Dict[str, dict] = {}; read = 0
+            stack = [""]
+            while stack:
+                rel = stack.pop(); full = os.path.join(self.root, rel) if rel else self.root
+                try: mtime = os.stat(full).st_mtime_ns
+                except OSError: continue
+                entry = self.dirs.get(rel)
+                if rebuild or not entry or entry.get("m") != mtime:
+                    subdirs, files = [], []
+                    try:
+                        with os.scandir(full) as it:
+                            for de in it:
+                                try:
+                                    if de.is_dir():
+                                        if not de.is_symlink(): subdirs.append(de.name)
+                                    elif os.path.splitext(de.name)[1].lower() in IMAGE_EXTS:
+                                        files.append(de.name)
+                                except OSError: pass
+                    except OSError: continue
+                    entry = {"m": mtime, "d": subdirs, "f": files}; read += 1
+                new[rel] = entry
+                stack.extend(os.path.join(rel, d) for d in entry["d"])
+            changed = read > 0 or len(new) != len(self.dirs)
+            self.dirs = new; self.dirs_read = read
+            if changed:
+                self._rebuild_lookup()
+            self.scan_sec = time.perf_counter() - t0
+            if changed: self._save()
+        return self
+
+    def _rebuild_lookup(self) -> None:
+        items = []
+        for rel, entry in self.dirs.items():
+            base = os.path.join(self.root, rel) if rel else self.root
+            for name in entry.get("f", []):
+                items.append((name.upper(), os.path.join(base, name)))
+        items.sort()
+        starts, pos = [], 0
+        for up, _p in items:
+            starts.append(pos); pos += len(up) + 1
+        self._lookup = ("\n".join(u for u, _p in items), starts, [p for _u, p in items], {})
+
+    def lookup(self, term: str) -> List[str]:
+        """Files whose name contains term (case-insensitive), sorted by file name."""
+        needle = term.strip().upper()
+        if not needle or "\n" in needle: return []
+        blob, starts, paths, memo = self._lookup
+        hit = memo.get(needle)
+        if hit is not None: return list(hit)
+        out: List[str] = []; i = blob.find(needle)
+        while i != -1:
+            k = bisect.bisect_right(starts, i) - 1
+            out.append(paths[k])
+            if k + 1 >= len(starts): break
+            i = blob.find(needle, starts[k + 1])
+        memo[needle] = out
+        return list(out)
+
+_LOCAL_INDEXES: Dict[str, LocalIndex] = {}
+_LOCAL_INDEXES_LOCK = threading.Lock()
+
+def local_index_for(root_dir: str, refresh: bool = False, rebuild: bool = False) -> LocalIndex:
+    """Shared index for root_dir; it is brought up to date on first use and when asked."""
+    key = os.path.normcase(os.path.normpath(os.path.abspath(root_dir)))
+    with _LOCAL_INDEXES_LOCK:
+        idx = _LOCAL_INDEXES.get(key); fresh = idx is None
+        if fresh: idx = _LOCAL_INDEXES[key] = LocalIndex(root_dir)
+    if fresh or refresh or rebuild: idx.refresh(rebuild=rebuild)
+    return idx
+
 def candidates_local_by_code_or_name(term: str, root_dir: str) -> List[str]:
-    needle = term.strip().upper()
-    hits: List[str] = []
-    for base, _dirs, files in os.walk(root_dir):
-        for name in files:
-            ext = os.path.splitext(name)[1].lower()
-            if ext in IMAGE_EXTS and needle in name.upper():
-                hits.append(os.path.join(base, name))
-    hits.sort(key=lambda p: os.path.basename(p).upper())
-    return hits
+    return local_index_for(root_dir).lookup(term)
 
 # -------- One Piece (code-based) --------
 def candidates_dotgg(card_code: str) -> List[str]:
@@ -102,127 +797,529 @@ def candidates_limitless(card_code: str) -> List[str]:
     urls += [f"{base}{code}_p{i}_EN.webp" for i in range(P_MIN, P_MAX+1)]
     return urls
 
-def probe_urls_in_parallel(urls: List[str]) -> List[Tuple[str, bytes]]:
-    results: List[Optional[Tuple[str, bytes]]] = [None] * len(urls)
-    with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as pool:
-        futmap = {pool.submit(request_ok, u): (i, u) for i, u in enumerate(urls)}
-        for fut in as_completed(futmap):
-            i, u = futmap[fut]; data = fut.result()
-            if data: results[i] = (u, data)
-    return [x for x in results if x is not None]
+def probe_exists_many(urls: List[str], headers: Optional[dict] = None) -> List[Optional[bool]]:
+    """
+    Existence check without downloading bodies: HEAD through ENGINE, or a 0-byte
+    Range GET where HEAD is refused. URLs already in the disk cache count as
+    existing. None = unknown (transport error or proxy in use).
+    """
+    out: List[Optional[bool]] = [None] * len(urls); todo: List[int] = []
+    for i, u in enumerate(urls):
+        try: key = requests.Request("GET", u).prepare().url
+        except Exception: continue
+        if CACHE.lookup(key): out[i] = True
+        elif not requests.utils.get_environ_proxies(key): todo.append(i)
+    retry: List[int] = []
+    for i, r in zip(todo, ENGINE.fetch_many([urls[i] for i in todo], headers, method="HEAD")):
+        if r is None or not r.status: continue
+        if r.status in (405, 501): retry.append(i)
+        else: out[i] = 200 <= r.status < 300
+    if retry:
+        rng = dict(headers or {}, Range="bytes=0-0")
+        for i, r in zip(retry, ENGINE.fetch_many([urls[i] for i in retry], rng)):
+            if r is not None and r.status: out[i] = r.status in (200, 206)
+    return out
 
-# -------- Yu-Gi-Oh! --------
+OP_VARIANTS_FILE = os.path.join(SETTINGS_DIR, "op_variants.json")
+OP_VARIANTS_TTL_SEC = 7 * 24 * 3600
+
+class KnownVariants:
+    """Remembers which variant URLs exist per (source, code), so later runs skip the misses."""
+    def __init__(self, path: str):
+        self.path = path; self._lock = threading.Lock()
+        self._data: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f: self._data = json.load(f)
+            except Exception:
+                self._data = {}
+        return self._data
+
+    def _save_locked(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(self._data, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[WARN] variant cache not saved: {e}")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            e = self._load().get(key)
+            if not e or time.time() - e.get("t", 0) > OP_VARIANTS_TTL_SEC: return None
+            return list(e["urls"])
+
+    def put(self, key: str, urls: List[str]) -> None:
+        with self._lock:
+            self._load()[key] = {"t": time.time(), "urls": list(urls)}; self._save_locked()
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._load().pop(key, None) is not None: self._save_locked()
+
+OP_VARIANTS = KnownVariants(OP_VARIANTS_FILE)
+
+def op_variant_key(card_code: str, source: str) -> str:
+    return f"{source}:{card_code.strip().upper()}"
+
+def op_candidate_urls(card_code: str, source: str) -> List[str]:
+    """Every URL a variant of the code may live under, in candidate order (most are missing)."""
+    return candidates_dotgg(card_code) if source == "dotgg" else candidates_limitless(card_code)
+
+def op_variant_urls(card_code: str, source: str) -> Tuple[str, List[str]]:
+    """
+    Existing variant URLs for a One Piece code, in candidate order; returns (cache key, urls).
+    Known codes come from OP_VARIANTS, new ones are probed with HEAD (no bodies).
+    """
+    key = op_variant_key(card_code, source)
+    known = OP_VARIANTS.get(key)
+    if known is not None: return key, known
+    urls = op_candidate_urls(card_code, source)
+    exists = probe_exists_many(urls)
+    found = [u for u, e in zip(urls, exists) if e or e is None]
+    # Learn only from definite answers; unknown codes (nothing found) are asked again next time.
+    if found and all(e is not None for e in exists): OP_VARIANTS.put(key, found)
+    return key, found
+
+# -------- Art candidates --------
+MAX_ARTS = 60
+
+class ArtCandidate:
+    """
+    One art/print of a card as a source lists it: the image URL (or local path), an optional
+    smaller preview URL, and the image bytes, which are only downloaded when first asked for.
+    """
+    __slots__ = ("url", "thumb_url", "headers", "on_missing", "_data", "_loaded", "_thumb")
+    def __init__(self, url: str, thumb_url: Optional[str] = None, headers: Optional[dict] = None,
+                 on_missing: Optional[Callable[[], None]] = None):
+        self.url = url; self.thumb_url = thumb_url; self.headers = headers; self.on_missing = on_missing
+        self._data: Optional[bytes] = None; self._loaded = False; self._thumb: Optional[bytes] = None
+
+    @property
+    def is_local(self) -> bool:
+        return not re.match(r'https?://', self.url, re.I)
+
+    def set_data(self, data: Optional[bytes]) -> None:
+        self._data = data; self._loaded = True
+
+    @property
+    def data(self) -> Optional[bytes]:
+        if not self._loaded:
+            if self.is_local:
+                try:
+                    with open(self.url, "rb") as f: self.set_data(f.read())
+                except Exception: self.set_data(None)
+            else:
+                self.set_data(fetch_bytes_many([self.url], self.headers)[0])
+                if self._data is None and self.on_missing: self.on_missing()
+        return self._data
+
+    @property
+    def preview(self) -> Optional[bytes]:
+        """Small image for the gallery: the source's thumbnail if it publishes one, else the full image."""
+        if not self.thumb_url or self.thumb_url == self.url: return self.data
+        if self._thumb is None: self._thumb = fetch_bytes_many([self.thumb_url], self.headers)[0] or b""
+        return self._thumb or self.data
+
+def first_image(cands: Iterable[ArtCandidate]) -> Optional[bytes]:
+    """Bytes of the first candidate that downloads; later candidates (and result pages) are never requested."""
+    for c in cands:
+        b = c.data
+        if b: return b
+    return None
+
+def load_previews(cands: List[ArtCandidate], deliver: Callable[[int, object, Optional[int]], None],
+                  render: Optional[Callable[[bytes], object]] = None,
+                  workers: int = PER_HOST_CONNECTIONS) -> ThreadPoolExecutor:
+    """
+    Download the picker previews in worker threads and call deliver(i, preview, drop) as each
+    arrives (preview = render(bytes) if given, None when missing). The same picture uploaded
+    under several URLs is shown once: drop is the index whose cell should go, the later of
+    the two in candidate order (content hash of the preview), else None.
+    """
+    lock = threading.Lock(); first: Dict[bytes, int] = {}
+    def load(i: int, cand: ArtCandidate):
+        data = drop = None
+        try:
+            data = cand.preview
+            if data:
+                h = hashlib.sha1(data).digest()
+                with lock:
+                    j = first.setdefault(h, i)
+                    if j != i:
+                        drop = max(i, j); first[h] = min(i, j)
+                if render: data = render(data)
+        except Exception: data = None
+        deliver(i, data or None, drop)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    for i, cand in enumerate(cands): pool.submit(load, i, cand)
+    return pool
+
+def local_candidates(term: str, local_dir: str) -> Iterator[ArtCandidate]:
+    for p in candidates_local_by_code_or_name(term, local_dir): yield ArtCandidate(p)
+
+def op_candidates(card_code: str, source: str) -> Iterator[ArtCandidate]:
+    key, urls = op_variant_urls(card_code, source)
+    forget = lambda: OP_VARIANTS.forget(key)      # a known variant vanished: probe again next time
+    for u in urls: yield ArtCandidate(u, on_missing=forget)
+
+# -------- Yu-Gi-Oh! offline database (YGOPRODeck snapshot) --------
+YGO_INDEX_FILE = os.path.join(SETTINGS_DIR, "ygo_index.sqlite")
+YGOPRODECK_DBVER = "https://db.ygoprodeck.com/api/v7/checkDBVer.php"
+
+def _ygo_rows(cards: Iterable[dict]) -> Iterator[tuple]:
+    for card in cards:
+        cid = card.get("id"); nm = str(card.get("name", ""))
+        if not cid or not nm: continue
+        imgs = [[ci.get("image_url") or ci.get("image_url_small"), ci.get("image_url_small") or ci.get("image_url")]
+                for ci in card.get("card_images") or [] if ci.get("image_url") or ci.get("image_url_small")]
+        yield (int(cid), nm, norm_card_name(nm), json.dumps(imgs))
+
+def _ygo_download(params: Optional[dict], dest: str) -> None:
+    with SESSION.get(YGOPRODECK_API, params=params, stream=True, timeout=120) as r:
+        if params and r.status_code == 400:   # the API answers 400 when no card matches the date range
+            with open(dest, "w", encoding="utf-8") as f: f.write('{"data": []}')
+            return
+        r.raise_for_status()
+        with open(dest, "wb") as f:
+            for chunk in r.iter_content(1 << 20): f.write(chunk)
+
+def _ygo_db_version() -> Optional[str]:
+    r = http_get(YGOPRODECK_DBVER)
+    try: return str(r.json()[0].get("database_version")) if r else None
+    except Exception: return None
+
+def update_ygo_database(db_path: str = YGO_INDEX_FILE, full: bool = False,
+                        progress: Optional[Callable[[int], None]] = None) -> Tuple[str, int]:
+    """
+    Download the YGOPRODeck card database into a local SQLite store (name, id, image and
+    alternate-artwork URLs). The first run (or full=True) fetches the whole cardinfo.php
+    dump; later runs compare checkDBVer.php and only fetch cards released since the last
+    update (by TCG date). Returns ("full" | "incremental" | "current", cards written).
+    """
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    version = _ygo_db_version()
+    exists = os.path.exists(db_path)
+    meta: Dict[str, str] = {}
+    if exists: ix = YgoIndex(db_path); meta = ix.meta(); ix.close()
+    if exists and not full and version and meta.get("version") == version:
+        return "current", 0
+    incremental = exists and not full and meta.get("updated")
+    target = db_path if incremental else db_path + ".tmp"
+    dump = db_path + ".download.json"
+    if incremental:
+        since = time.strftime("%Y-%m-%d", time.gmtime(float(meta["updated"]) - 45 * 86400))
+        params = {"startdate": since, "enddate": time.strftime("%Y-%m-%d"), "dateregion": "tcg_date"}
+    else:
+        params = None
+        if os.path.exists(target): os.remove(target)
+    YGO_INDEX.close()
+    try:
+        _ygo_download(params, dump)
+        con = sqlite3.connect(target)
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, name TEXT, name_norm TEXT, images TEXT)")
+            con.execute("CREATE INDEX IF NOT EXISTS cards_name ON cards (name_norm)")
+            con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            n = 0; batch = []
+            with open(dump, "r", encoding="utf-8") as fp:
+                for row in _ygo_rows(iter_json_array(fp, key="data")):
+                    batch.append(row); n += 1
+                    if len(batch) >= 2000:
+                        con.executemany("INSERT OR REPLACE INTO cards VALUES (?,?,?,?)", batch); batch = []
+                        if progress: progress(n)
+            if batch: con.executemany("INSERT OR REPLACE INTO cards VALUES (?,?,?,?)", batch)
+            con.executemany("INSERT OR REPLACE INTO meta VALUES (?,?)",
+                            [("version", version or ""), ("updated", str(time.time()))])
+            con.commit()
+        finally:
+            con.close()
+        if not incremental: os.replace(target, db_path)
+    finally:
+        try: os.remove(dump)
+        except OSError: pass
+    return ("incremental" if incremental else "full"), n
+
+class YgoIndex:
+    """Read side of the local YGOPRODeck store; exact and fuzzy name lookups without network."""
+    def __init__(self, path: str):
+        self.path = path; self._con: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock(); self._names: Optional[List[str]] = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None: self._con.close(); self._con = None
+            self._names = None
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _q(self, sql: str, args: tuple = ()) -> list:
+        with self._lock:
+            if self._con is None: self._con = sqlite3.connect(self.path, check_same_thread=False)
+            return self._con.execute(sql, args).fetchall()
+
+    def meta(self) -> Dict[str, str]:
+        try: return dict(self._q("SELECT key, value FROM meta"))
+        except sqlite3.Error: return {}
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """Exact name, else the shortest name containing the term, else the closest spelling.
+        Returns {"id", "name", "images": [[url, small], …], "exact": bool} or None."""
+        if not self.available(): return None
+        key = norm_card_name(name)
+        try:
+            rows = self._q("SELECT id, name, images FROM cards WHERE name_norm = ? LIMIT 1", (key,))
+            exact = bool(rows)
+            if not rows:
+                like = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                rows = self._q("SELECT id, name, images FROM cards WHERE name_norm LIKE ? ESCAPE '\\' "
+                               "ORDER BY length(name_norm), name_norm LIMIT 1", (f"%{like}%",))
+            if not rows:
+                if self._names is None:
+                    self._names = [r[0] for r in self._q("SELECT name_norm FROM cards")]
+                close = difflib.get_close_matches(key, self._names, n=1, cutoff=0.85)
+                if close: rows = self._q("SELECT id, name, images FROM cards WHERE name_norm = ? LIMIT 1", (close[0],))
+        except sqlite3.Error:
+            return None
+        if not rows: return None
+        cid, nm, imgs = rows[0]
+        return {"id": cid, "name": nm, "images": json.loads(imgs), "exact": exact}
+
+YGO_INDEX = YgoIndex(YGO_INDEX_FILE)
 
 # -------- Yu-Gi-Oh! --------
-def fetch_ygo_images(name_term: str) -> List[Tuple[str, bytes]]:
-    out: List[Tuple[str, bytes]] = []
+def _ygo_variant_artworks(card: dict) -> List[str]:
+    """Extra artwork URLs from the card's YGOPRODeck page (variant-artwork gallery)."""
+    urls: List[str] = []
+    try:
+        cid = card.get("id"); nm = str(card.get("name",""))
+        if cid and nm:
+            slug = re.sub(r'[^a-z0-9]+', '-', nm.lower()); slug = re.sub(r'-+', '-', slug).strip('-')
+            rp = http_get(f"https://ygoprodeck.com/card/{slug}-{cid}")
+            if rp and rp.text:
+                html_text = rp.text
+                for m in re.finditer(r'<img[^>]+class\s*=\s*(?:"|\')[^"\']*variant-artwork[^"\']*(?:"|\')[^>]*>', html_text, flags=re.I|re.DOTALL):
+                    tag = m.group(0)
+                    msrc = re.search(r'\s(?:src|data-src|data-lazy-src)\s*=\s*(?:"([^"]+)"|\'([^\']+)\')', tag, flags=re.I)
+                    url2 = msrc.group(1) if (msrc and msrc.group(1) is not None) else (msrc.group(2) if msrc else None)
+                    if not url2:
+                        mset = re.search(r'\s(?:srcset|data-srcset)\s*=\s*"([^"]+)"', tag, flags=re.I)
+                        if mset: url2 = mset.group(1).split(",")[0].split()[0]
+                    if not url2: continue
+                    urls.append(url2)
+    except Exception: pass
+    return urls
+
+def ygo_candidates(name_term: str) -> Iterator[ArtCandidate]:
+    """
+    Arts of a Yu-Gi-Oh! card: an exact name in the local YGOPRODeck snapshot, else the API's
+    exact name, else the closest local name, else the API's fname search.
+    """
     name_clean = name_term.strip()
+    local = YGO_INDEX.lookup(name_clean)
 
-    def collect_from_card(card: dict):
-        imgs = card.get("card_images", []) or []
-        for ci in imgs:
+    def from_local(card: dict) -> Iterator[ArtCandidate]:
+        for u, small in card["images"]: yield ArtCandidate(u, small)
+        # Variant artworks are not in the snapshot; the card page is asked for the same lazy way.
+        for url in _ygo_variant_artworks(card): yield ArtCandidate(url)
+
+    def from_card(card: dict) -> Iterator[ArtCandidate]:
+        for ci in card.get("card_images", []) or []:
             url = ci.get("image_url") or ci.get("image_url_small")
-            if not url: continue
-            b = request_ok(url)
-            if b: out.append((url, b))
-        try:
-            cid = card.get("id"); nm = str(card.get("name",""))
-            if cid and nm:
-                slug = re.sub(r'[^a-z0-9]+', '-', nm.lower()); slug = re.sub(r'-+', '-', slug).strip('-')
-                rp = http_get(f"https://ygoprodeck.com/card/{slug}-{cid}")
-                if rp and rp.text:
-                    html_text = rp.text
-                    for m in re.finditer(r'<img[^>]+class\s*=\s*(?:"|\')[^"\']*variant-artwork[^"\']*(?:"|\')[^>]*>', html_text, flags=re.I|re.DOTALL):
-                        tag = m.group(0)
-                        msrc = re.search(r'\s(?:src|data-src|data-lazy-src)\s*=\s*(?:"([^"]+)"|\'([^\']+)\')', tag, flags=re.I)
-                        url2 = msrc.group(1) if (msrc and msrc.group(1) is not None) else (msrc.group(2) if msrc else None)
-                        if not url2:
-                            mset = re.search(r'\s(?:srcset|data-srcset)\s*=\s*"([^"]+)"', tag, flags=re.I)
-                            if mset: url2 = mset.group(1).split(",")[0].split()[0]
-                        if not url2: continue
-                        b2 = request_ok(url2)
-                        if b2: out.append((url2, b2))
-        except Exception: pass
+            if url: yield ArtCandidate(url, ci.get("image_url_small"))
+        # The card page is only requested if someone asks for more than the API images.
+        for url in _ygo_variant_artworks(card): yield ArtCandidate(url)
+
+    if local and local["exact"]:
+        yield from from_local(local); return
 
     r = http_get(YGOPRODECK_API, params={"name": name_clean})
     if r:
-        try:
-            data = r.json(); cards = data.get("data") or []
-            for card in cards:
-                if str(card.get("name","")).lower() == name_clean.lower():
-                    collect_from_card(card)
-                    if out: return out
-        except Exception: pass
+        try: cards = r.json().get("data") or []
+        except Exception: cards = []
+        for card in cards:
+            if str(card.get("name","")).lower() == name_clean.lower():
+                yield from from_card(card); return
+
+    if local:
+        yield from from_local(local); return
 
     r = http_get(YGOPRODECK_API, params={"fname": name_clean})
     if r:
+        try: cards = r.json().get("data", [])
+        except Exception: cards = []
+        if not cards: return
+        exact = None
+        for c in cards:
+            if str(c.get("name","")).lower() == name_clean.lower():
+                exact = c; break
+        yield from from_card(exact or cards[0])
+
+# -------- MTG offline index (Scryfall bulk data) --------
+SCRYFALL_INDEX_FILE = os.path.join(SETTINGS_DIR, "scryfall_index.sqlite")
+
+def iter_json_array(fp, chunk_size: int = 1 << 20, key: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yield the elements of a JSON array from a text stream, one chunk in memory at a time.
+    Without key the document itself is the array; with key the array is the first
+    '"key": [' found (e.g. key="data" for {"data": [...]}).
+    """
+    dec = json.JSONDecoder(); buf = ""; i = 0; eof = False; started = False
+    def more() -> bool:
+        nonlocal buf, i, eof
+        chunk = fp.read(chunk_size)
+        if not chunk: eof = True; return False
+        buf = buf[i:] + chunk; i = 0; return True
+    if key is not None:
+        pat = re.compile(r'"%s"\s*:\s*(?=\[)' % re.escape(key))
+        while True:
+            m = pat.search(buf, i)
+            if m: i = m.end(); break
+            keep = max(i, len(buf) - len(key) - 64)   # a match may straddle two chunks
+            i = keep
+            if not more(): return
+    while True:
+        while i < len(buf) and buf[i] in " \t\r\n,": i += 1
+        if i >= len(buf):
+            if not more(): return
+            continue
+        if not started:
+            if buf[i] != "[": raise ValueError("not a JSON array")
+            started = True; i += 1; continue
+        if buf[i] == "]": return
         try:
-            data = r.json(); cards = data.get("data", [])
-            if not cards: return out
-            exact = None
-            for c in cards:
-                if str(c.get("name","")).lower() == name_clean.lower():
-                    exact = c; break
-            collect_from_card(exact or cards[0])
-        except Exception: pass
-    return out
+            obj, end = dec.raw_decode(buf, i)
+        except json.JSONDecodeError:
+            if eof or not more(): raise
+            continue
+        i = end
+        yield obj
+
+def norm_card_name(name: str) -> str:
+    """Case/accent/spacing-insensitive key for card names."""
+    s = unicodedata.normalize("NFKD", name.replace("’", "'"))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return re.sub(r"\s+", " ", s).strip().lower().replace("æ", "ae")
+
+def _scryfall_print_urls(card: dict) -> Tuple[Optional[str], Optional[str]]:
+    """(full image, small image) the same way mtg_candidates picks them."""
+    for uris in [card.get("image_uris") or {}] + [f.get("image_uris") or {} for f in card.get("card_faces") or []]:
+        url = uris.get("png") or uris.get("large") or uris.get("normal") or uris.get("small")
+        if url: return url, (uris.get("small") or uris.get("normal") or url)
+    return None, None
+
+def import_scryfall_bulk(path: str, db_path: str = SCRYFALL_INDEX_FILE,
+                         progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Stream a Scryfall bulk-data file (default_cards / all_cards, .json or .json.gz)
+    into a small SQLite index: normalized name → print image URLs. English prints only,
+    like the online search. Returns the number of prints stored.
+    """
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    tmp = db_path + ".tmp"
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if os.path.exists(tmp): os.remove(tmp)
+    con = sqlite3.connect(tmp)
+    try:
+        con.execute("CREATE TABLE prints (name TEXT, released TEXT, url TEXT, thumb TEXT, set_code TEXT, cn TEXT)")
+        con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        n = 0; batch = []
+        with opener(path, "rt", encoding="utf-8") as fp:
+            for card in iter_json_array(fp):
+                if card.get("lang", "en") != "en" or card.get("object") != "card": continue
+                url, thumb = _scryfall_print_urls(card)
+                if not url: continue
+                names = {card.get("name", "")}
+                names.update(f.get("name", "") for f in card.get("card_faces") or [])
+                for nm in names:
+                    if nm:
+                        batch.append((norm_card_name(nm), card.get("released_at", ""), url, thumb,
+                                      card.get("set", ""), card.get("collector_number", "")))
+                n += 1
+                if len(batch) >= 5000:
+                    con.executemany("INSERT INTO prints VALUES (?,?,?,?,?,?)", batch); batch = []
+                    if progress: progress(n)
+        if batch: con.executemany("INSERT INTO prints VALUES (?,?,?,?,?,?)", batch)
+        con.execute("CREATE INDEX prints_name ON prints (name, released)")
+        con.executemany("INSERT INTO meta VALUES (?,?)",
+                        [("source", os.path.basename(path)), ("imported", str(int(time.time()))), ("prints", str(n))])
+        con.commit()
+    finally:
+        con.close()
+    MTG_INDEX.close()
+    os.replace(tmp, db_path)
+    return n
+
+class MtgIndex:
+    """Read side of the Scryfall bulk index (opened lazily, shared across threads)."""
+    def __init__(self, path: str):
+        self.path = path; self._con: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None: self._con.close(); self._con = None
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def prints(self, name: str, limit: int = 60) -> Optional[List[Tuple[str, str]]]:
+        """[(full url, small url)] newest first; None if no index is installed."""
+        if not self.available(): return None
+        with self._lock:
+            try:
+                if self._con is None: self._con = sqlite3.connect(self.path, check_same_thread=False)
+                rows = self._con.execute("SELECT url, thumb FROM prints WHERE name = ? "
+                                         "ORDER BY released DESC LIMIT ?", (norm_card_name(name), limit)).fetchall()
+            except sqlite3.Error:
+                return None
+        seen, out = set(), []
+        for url, thumb in rows:
+            if url not in seen: seen.add(url); out.append((url, thumb))
+        return out
+
+MTG_INDEX = MtgIndex(SCRYFALL_INDEX_FILE)
 
 # -------- MTG (Scryfall prints) --------
-def fetch_mtg_images(name_term: str) -> List[Tuple[str, bytes]]:
-    out: List[Tuple[str, bytes]] = []
+def mtg_candidates(name_term: str) -> Iterator[ArtCandidate]:
+    """Prints of an MTG card: imported Scryfall bulk data first, else the search API page by page."""
+    offline = MTG_INDEX.prints(name_term)
+    if offline:
+        for u, t in offline: yield ArtCandidate(u, t)
+        return
     query = f'!"{name_term}" include:extras'
     params = {"q": query, "unique": "prints", "order": "released"}
     r = http_get(SCRYFALL_SEARCH, params=params)
-    def add_from_list(obj):
-        for card in obj.get("data", []):
-            uris = card.get("image_uris") or {}
-            url = uris.get("png") or uris.get("large") or uris.get("normal") or uris.get("small")
-            if not url and card.get("card_faces"):
-                for face in card["card_faces"]:
-                    uris = face.get("image_uris") or {}
-                    url = uris.get("png") or uris.get("large") or uris.get("normal") or uris.get("small")
-                    if url:
-                        b = request_ok(url)
-                        if b: out.append((url, b))
-                        url = None
-                        break
-                continue
-            if url:
-                b = request_ok(url)
-                if b: out.append((url, b))
+    found = False
     if r:
         try:
             j = r.json()
-            add_from_list(j)
-            while j.get("has_more") and len(out) < 60:
+            while True:
+                for card in j.get("data", []):
+                    url, thumb = _scryfall_print_urls(card)
+                    if url: found = True; yield ArtCandidate(url, thumb)
+                # Next page only when the consumer wants more than this one.
                 next_url = j.get("next_page")
-                if not next_url: break
+                if not j.get("has_more") or not next_url: break
                 r2 = http_get(next_url)
                 if not r2: break
                 j = r2.json()
-                add_from_list(j)
         except Exception:
             pass
-    if not out:
+    if not found:
         r = http_get(SCRYFALL_NAMED, params={"fuzzy": name_term})
         if r:
             try:
                 j = r.json()
-                uris = j.get("image_uris") or {}
-                for key in ("png","large","normal","small"):
-                    if uris.get(key):
-                        b = request_ok(uris[key])
-                        if b: out.append((uris[key], b)); break
-                if not out and j.get("card_faces"):
-                    for face in j["card_faces"]:
-                        uris = face.get("image_uris") or {}
-                        for key in ("png","large","normal","small"):
-                            if uris.get(key):
-                                b = request_ok(uris[key])
-                                if b: out.append((uris[key], b))
+                for face in ([j] if j.get("image_uris") else j.get("card_faces") or []):
+                    url, thumb = _scryfall_print_urls(face)
+                    if url: yield ArtCandidate(url, thumb)
             except Exception:
                 pass
-    return out
 
 # -------- Pokémon (PKMNCards, multi-art with filtering) --------
 def _first_href_in_search(html_text: str, term: str) -> Optional[str]:
@@ -247,32 +1344,34 @@ def _og_image(html_text: str) -> Optional[str]:
     if m: return html.unescape(m.group(1))
     return None
 
-def fetch_pokemon_images(name_term: str) -> List[Tuple[str, bytes]]:
-    """Collect images from PKMNCards search grid.
+def _pkmn_canonicalize(u: str) -> str:
+    # Turn ...-200x300.jpg into ....jpg (full image)
+    return re.sub(r'-(\d+)x(\d+)(\.(?:png|jpe?g|webp))$', r'\3', u, flags=re.I)
+
+def _pkmn_url_key(u: str) -> str:
+    """Dedup key for an upload URL: scheme, host case, query and fragment do not matter."""
+    p = urllib.parse.urlsplit(u)
+    return f"{p.netloc.lower()}{urllib.parse.unquote(p.path)}"
+
+def pokemon_candidates(name_term: str) -> Iterator[ArtCandidate]:
+    """Arts from the PKMNCards search grid.
     - Strict: ALL keywords in the query must appear in the filename/URL (order-free).
-    - Convert thumbnail URLs (…-150x150.jpg) to original full images by stripping the -WxH suffix.
-    - Download with Referer to avoid 1x1 anti-hotlink placeholders.
+    - Full image = thumbnail URL (…-150x150.jpg) without the -WxH suffix; the thumbnail is kept as preview.
+    - Downloads send a Referer to avoid 1x1 anti-hotlink placeholders.
     - Fallback: first result page og:image/upload.
     """
-    out: List[Tuple[str, bytes]] = []
     term = name_term.strip().lower()
     # Build keywords from the query (keep short tokens like 'ex', 'gx', 'us', 'promo')
     keywords = re.findall(r'[a-z0-9]+', term)
 
     r = http_get(PKMNCARDS_SEARCH + requests.utils.quote(term))
     if not r:
-        return out
+        return
     html_text = r.text
 
     # Grab all candidate image URLs from the search page
     urls = re.findall(r'(https?://pkmncards\.com/wp-content/uploads/[^"]+\.(?:png|jpg|jpeg|webp))', html_text, re.I)
-    seen = set()
-    filtered: List[str] = []
-
-    def canonicalize(u: str) -> str:
-        # Turn ...-200x300.jpg into ....jpg (full image)
-        return re.sub(r'-(\d+)x(\d+)(\.(?:png|jpe?g|webp))$', r'\3', u, flags=re.I)
-
+    seen = set(); found = False
     for u in urls:
         base = os.path.basename(u).lower()
         if 'cropped-' in base or base.startswith('crop-') or base.startswith('cropped-'):
@@ -281,79 +1380,111 @@ def fetch_pokemon_images(name_term: str) -> List[Tuple[str, bytes]]:
         base_norm = re.sub(r'[^a-z0-9]+', '', base)
         if keywords and not all(k in base_norm for k in keywords):
             continue
-        u_full = canonicalize(u)
-        if u_full not in seen:
-            seen.add(u_full)
-            filtered.append(u_full)
-
-    # Fetch images with Referer header
-    for u in filtered[:60]:
-        b = request_ok_pkmn(u)
-        if b:
-            out.append((u, b))
+        u_full = _pkmn_canonicalize(u); key = _pkmn_url_key(u_full)
+        if key not in seen:
+            seen.add(key); found = True
+            yield ArtCandidate(u_full, u if u != u_full else None, PKMN_HEADERS)
 
     # Fallback: open first result page and try main image
-    if not out:
+    if not found:
         href = _first_href_in_search(html_text, term)
         if href:
             r2 = http_get(href)
             if r2:
                 img = _first_upload_image(r2.text) or _og_image(r2.text)
-                if img:
-                    img = canonicalize(img)
-                    b = request_ok_pkmn(img)
-                    if b:
-                        out.append((img, b))
-    return out
+                if img: yield ArtCandidate(_pkmn_canonicalize(img), None, PKMN_HEADERS)
 
 # -------- Image utils --------
-def make_padded_thumb(img_bytes: bytes, w: int, h: int) -> ImageTk.PhotoImage:
+THUMB_CACHE_MAX = 400   # padded gallery thumbnails kept in memory (~125 KB each)
+_thumb_cache: Dict[str, PILImage.Image] = {}; _thumb_lock = threading.Lock()
+
+def render_padded_thumb(img_bytes: bytes, w: int, h: int) -> PILImage.Image:
+    """
+    w×h RGBA thumbnail, centred on a transparent canvas. Safe to call from worker threads.
+    Big images are decoded at reduced scale (JPEG DCT draft, else Image.reduce) before the
+    final LANCZOS step. Results are cached by content hash.
+    """
+    key = f"{hashlib.sha1(img_bytes).hexdigest()}:{w}x{h}"
+    with _thumb_lock:
+        hit = _thumb_cache.pop(key, None)
+        if hit is not None: _thumb_cache[key] = hit; return hit
     with PILImage.open(BytesIO(img_bytes)) as im:
+        if im.format == "JPEG": im.draft("RGB", (w * 2, h * 2))
+        if im.mode not in ("RGB", "RGBA", "L"): im = im.convert("RGBA")
+        factor = min(im.width // (w * 2), im.height // (h * 2))
+        if factor > 1: im = im.reduce(factor)
         im = im.convert("RGBA"); im.thumbnail((w, h), PILImage.LANCZOS)
         canvas = PILImage.new("RGBA", (w, h), (255, 255, 255, 0))
         x = (w - im.width) // 2; y = (h - im.height) // 2
         canvas.paste(im, (x, y))
-        return ImageTk.PhotoImage(canvas)
+    with _thumb_lock:
+        _thumb_cache[key] = canvas
+        while len(_thumb_cache) > THUMB_CACHE_MAX: _thumb_cache.pop(next(iter(_thumb_cache)))
+    return canvas
+
+def make_padded_thumb(img_bytes: bytes, w: int, h: int) -> ImageTk.PhotoImage:
+    return ImageTk.PhotoImage(render_padded_thumb(img_bytes, w, h))
+
+# PNG encoder settings by profile name. "smallest" is Pillow's optimize=True (zlib level 9
+# plus the extra optimisation pass) and was the only behaviour before profiles existed.
+PNG_PROFILES: Dict[str, dict] = {
+    "fast": {"compress_level": 1},
+    "balanced": {"compress_level": 6},
+    "smallest": {"optimize": True},
+}
+DEFAULT_PNG_PROFILE = "smallest"
+
+def png_params(profile: str) -> dict:
+    return dict(PNG_PROFILES.get(profile) or PNG_PROFILES[DEFAULT_PNG_PROFILE])
+
+def _decode_card(im: PILImage.Image) -> PILImage.Image:
+    """
+    Decoded card in the cheapest mode that keeps the picture: RGB, or RGBA only when the
+    source really has transparent pixels (opaque JPEGs and PNGs carry no alpha channel).
+    """
+    im.load()
+    if im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info:
+        rgba = im.convert("RGBA")
+        if rgba.getchannel("A").getextrema()[0] < 255: return rgba
+        return rgba.convert("RGB")
+    return im if im.mode == "RGB" else im.convert("RGB")
 
 def save_png(image_bytes: bytes, out_path: str,
              add_border: bool = True, border_px: int = 50, border_color: str = 'white',
              do_upscale: bool = False, min_height_px: int = 1500,
-             dpi: int = 300) -> None:
-    with PILImage.open(BytesIO(image_bytes)) as im:
-        im = im.convert("RGBA")
-        if do_upscale:
-            w, h = im.size
-            if h < min_height_px:
-                scale = float(min_height_px) / float(h)
-                im = im.resize((max(1, int(round(w * scale))), min_height_px), PILImage.LANCZOS)
-                im = im.filter(ImageFilter.SHARPEN)
+             dpi: int = 300, profile: str = DEFAULT_PNG_PROFILE) -> None:
+    """
+    Decode → (upscale + sharpen) → border → PNG. The card stays in RGB unless it has
+    transparency, and the border is a canvas of the final size the card is pasted into.
+    """
+    name = os.path.basename(out_path)
+    with PILImage.open(BytesIO(image_bytes)) as src:
+        with TRACE.span("decode", file=name):
+            im = _decode_card(src)
+        w, h = im.size
+        if do_upscale and h < min_height_px:
+            with TRACE.span("resize", file=name):
+                w = max(1, int(round(w * float(min_height_px) / float(h)))); h = min_height_px
+                im = im.resize((w, h), PILImage.LANCZOS).filter(ImageFilter.SHARPEN)
         if add_border and border_px > 0:
-            im = ImageOps.expand(im, border=border_px, fill=border_color)
-        im.save(out_path, "PNG", optimize=True, dpi=(dpi, dpi))
+            canvas = PILImage.new(im.mode, (w + 2 * border_px, h + 2 * border_px), border_color)
+            canvas.paste(im, (border_px, border_px))
+            if im is not src: im.close()
+            im = canvas
+        save_image_timed(im, out_path, "PNG", dpi=(dpi, dpi), **png_params(profile))
 
 def mm_to_px(mm: float, dpi: int) -> int:
     return int(round(mm / 25.4 * dpi))
 
-def draw_crop_marks(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: int,
-                    length_px: int, gap_px: int, stroke_px: int = 1, color=(0,0,0),
-                    border_px: int = 0, hide_under_border: bool = False) -> None:
+def crop_mark_segments(x: float, y: float, w: float, h: float, L: float, G: float,
+                       border_px: float = 0, hide_under_border: bool = False) -> List[tuple]:
     """
-    Draws external corner crop marks around the card rectangle.
+    Corner crop mark segments around the card rectangle, in the caller's units:
+    ("h", x1, x2, y) and ("v", x, y1, y2). Shared by the raster and the vector PDF output.
     If hide_under_border=True and border_px>0, segments are CLIPPED so they only appear
     in the future border area and are therefore fully covered by the border.
     """
-    s = max(1, int(stroke_px)); L = max(0, int(length_px)); G = max(0, int(gap_px))
-    Xl = int(x); Xr = int(x + w); Yt = int(y); Yb = int(y + h)
-
-    # Helper: draw solid segments as rectangles (pixel-perfect)
-    def hseg(x1, x2, yy):
-        if x2 <= x1: return
-        y1 = yy - (s // 2); y2 = y1 + s - 1
-        draw.rectangle([int(x1), int(y1), int(x2), int(y2)], fill=color)
-    def vseg(xx, y1, y2):
-        if y2 <= y1: return
-        x1 = xx - (s // 2); x2 = x1 + s - 1
-        draw.rectangle([int(x1), int(y1), int(x2), int(y2)], fill=color)
+    Xl = x; Xr = x + w; Yt = y; Yb = y + h
 
     # Compute unclipped segments (left/top corner shown; others analogous)
     # Top-left horizontal: y = Yt - G, x in [Xl - G - L, Xl - G]
@@ -406,8 +1537,25 @@ def draw_crop_marks(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: int,
                     yy2 = min(y2, bot_max)
                     if yy2 > yy1: clipped.append(("v", x, yy1, yy2))
         segs = clipped
+    return segs
+
+def draw_crop_marks(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: int,
+                    length_px: int, gap_px: int, stroke_px: int = 1, color=(0,0,0),
+                    border_px: int = 0, hide_under_border: bool = False) -> None:
+    """Draws external corner crop marks around the card rectangle (see crop_mark_segments)."""
+    s = max(1, int(stroke_px)); L = max(0, int(length_px)); G = max(0, int(gap_px))
+
+    # Helper: draw solid segments as rectangles (pixel-perfect)
+    def hseg(x1, x2, yy):
+        if x2 <= x1: return
+        y1 = yy - (s // 2); y2 = y1 + s - 1
+        draw.rectangle([int(x1), int(y1), int(x2), int(y2)], fill=color)
+    def vseg(xx, y1, y2):
+        if y2 <= y1: return
+        x1 = xx - (s // 2); x2 = x1 + s - 1
+        draw.rectangle([int(x1), int(y1), int(x2), int(y2)], fill=color)
 
-    # Draw
+    segs = crop_mark_segments(int(x), int(y), int(w), int(h), L, G, border_px, hide_under_border)
     for kind, a1, a2, b in segs:
         if kind == "h":
             hseg(a1, a2, b)
@@ -416,18 +1564,13 @@ def draw_crop_marks(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: int,
 
 
 
-def build_a4_pages(images: List[bytes], dpi: int,
-                   card_w_mm: float, card_h_mm: float,
-                   margin_x_mm: float, margin_y_mm: float,
-                   gap_x_mm: float, gap_y_mm: float,
-                   crop_marks: bool = False, crop_len_mm: float = 2.5, crop_gap_mm: float = 0.8,
-                   crop_stroke_px: int = 1, crop_color=(0,0,0),
-                   add_border: bool = False, border_px: int = 0, border_color: str = 'white') -> List[PILImage.Image]:
+def a4_geometry(dpi: int, card_w_mm: float, card_h_mm: float, margin_x_mm: float, margin_y_mm: float,
+                gap_x_mm: float, gap_y_mm: float) -> Tuple[int, int, int, int, List[Tuple[int, int]]]:
+    """Pixel layout of a 3×3 A4 sheet → (page_w, page_h, card_w, card_h, top-left of the 9 slots)."""
     page_w = mm_to_px(210, dpi); page_h = mm_to_px(297, dpi)
     card_w = mm_to_px(card_w_mm, dpi); card_h = mm_to_px(card_h_mm, dpi)
     margin_x = mm_to_px(margin_x_mm, dpi); margin_y = mm_to_px(margin_y_mm, dpi)
     gap_x = mm_to_px(gap_x_mm, dpi); gap_y = mm_to_px(gap_y_mm, dpi)
-    crop_len = mm_to_px(crop_len_mm, dpi); crop_gap = mm_to_px(crop_gap_mm, dpi)
 
     cols, rows = 3, 3
     needed_w = 2*margin_x + cols*card_w + (cols-1)*gap_x
@@ -436,35 +1579,548 @@ def build_a4_pages(images: List[bytes], dpi: int,
         over = needed_w - page_w; gap_x = max(0, gap_x - max(0, over // (cols-1)))
     if needed_h > page_h and (rows-1) > 0:
         over = needed_h - page_h; gap_y = max(0, gap_y - max(0, over // (rows-1)))
-    pages: List[PILImage.Image] = []
+    slots = [(margin_x + c * (card_w + gap_x), margin_y + r * (card_h + gap_y)) for r in range(rows) for c in range(cols)]
+    return page_w, page_h, card_w, card_h, slots
+
+def _content_keys(images: List[bytes]) -> List[str]:
+    """sha1 per card; multiply=on repeats the same bytes object, so hashing is memoized per object."""
+    keys: List[str] = []; by_obj: Dict[int, str] = {}
+    for b in images:
+        h = by_obj.get(id(b))
+        if h is None: h = by_obj[id(b)] = hashlib.sha1(b).hexdigest()
+        keys.append(h)
+    return keys
+
+# Crop marks of a sheet depend only on the layout and the number of cards on the page, so the
+# rectangles (segments, clipping, stroke) are computed once; pages just fill them.
+_crop_box_cache: Dict[tuple, List[Tuple[int, int, int, int]]] = {}
+
+def crop_mark_boxes(card_w: int, card_h: int, slots: List[Tuple[int, int]],
+                    length_px: int, gap_px: int, stroke_px: int = 1) -> List[Tuple[int, int, int, int]]:
+    """Rectangles (inclusive, for ImageDraw.rectangle) draw_crop_marks would draw for every slot."""
+    key = (card_w, card_h, tuple(slots), length_px, gap_px, stroke_px)
+    boxes = _crop_box_cache.get(key)
+    if boxes is None:
+        s = max(1, int(stroke_px)); L = max(0, int(length_px)); G = max(0, int(gap_px)); boxes = []
+        for x, y in slots:
+            for kind, a1, a2, b in crop_mark_segments(int(x), int(y), int(card_w), int(card_h), L, G):
+                if kind == "h" and a2 > a1: t = b - (s // 2); boxes.append((a1, t, a2, t + s - 1))
+                elif kind == "v" and b > a2: l = a1 - (s // 2); boxes.append((l, a2, l + s - 1, b))
+        if len(_crop_box_cache) >= 8: _crop_box_cache.clear()
+        _crop_box_cache[key] = boxes
+    return boxes
+
+def _a4_card_tile(img_bytes: bytes, card_w: int, card_h: int,
+                  add_border: bool, border_px: int, border_color: str) -> Tuple[PILImage.Image, int]:
+    """Decode + resize one card for the sheet; returns the tile and its border offset."""
+    with PILImage.open(BytesIO(img_bytes)) as im:
+        with TRACE.span("decode"): im = im.convert("RGB")
+        with TRACE.span("resize", size=f"{card_w}x{card_h}"): im = im.resize((card_w, card_h), PILImage.LANCZOS)
+        off = 0
+        if add_border and border_px > 0:
+            im = ImageOps.expand(im, border=border_px, fill=border_color)
+            off = border_px
+        return im, off
+
+def iter_a4_pages(images: List[bytes], dpi: int,
+                  card_w_mm: float, card_h_mm: float,
+                  margin_x_mm: float, margin_y_mm: float,
+                  gap_x_mm: float, gap_y_mm: float,
+                  crop_marks: bool = False, crop_len_mm: float = 2.5, crop_gap_mm: float = 0.8,
+                  crop_stroke_px: int = 1, crop_color=(0,0,0),
+                  add_border: bool = False, border_px: int = 0, border_color: str = 'white',
+                  stats: Optional[dict] = None) -> Iterator[PILImage.Image]:
+    """
+    Yield the A4 pages one at a time; only the page being composed is kept in memory.
+    Each distinct card is decoded and resized once: the finished tile is reused for
+    every later slot with the same content and dropped after its last use.
+    stats (if given) receives "tiles_decoded" and "tile_cache_hits".
+    """
+    page_w, page_h, card_w, card_h, slots = a4_geometry(dpi, card_w_mm, card_h_mm, margin_x_mm, margin_y_mm,
+                                                        gap_x_mm, gap_y_mm)
+    crop_len = mm_to_px(crop_len_mm, dpi); crop_gap = mm_to_px(crop_gap_mm, dpi)
+    # Tile cache keyed by content + target geometry.
+    tile_geo = (card_w, card_h, border_px if add_border and border_px > 0 else 0, border_color)
+    keys = [(h,) + tile_geo for h in _content_keys(images)]
+    last_use = {k: n for n, k in enumerate(keys)}
+    tiles: Dict[tuple, Tuple[PILImage.Image, int]] = {}
+    if stats is None: stats = {}
+    stats["tiles_decoded"] = stats["tile_cache_hits"] = 0
+
     for page_idx in range(0, math.ceil(len(images)/9)):
+        t_page = time.perf_counter()
         chunk = images[page_idx*9:(page_idx+1)*9]
         page = PILImage.new("RGB", (page_w, page_h), "white")
-        draw = ImageDraw.Draw(page)
-        positions = []
-        # collect positions for this page
-        for i, img_bytes in enumerate(chunk):
-            r = i // cols; c = i % cols
-            x = margin_x + c * (card_w + gap_x)
-            y = margin_y + r * (card_h + gap_y)
-            positions.append((i, img_bytes, x, y))
 
-        # PASS 1 — draw all crop marks (under everything)
+        # PASS 1 — crop marks (under everything), precomputed for this layout and card count
         if crop_marks:
-            for _, __, x, y in positions:
-                draw_crop_marks(draw, x, y, card_w, card_h, crop_len, crop_gap, crop_stroke_px, color=crop_color)
+            draw = ImageDraw.Draw(page)
+            for box in crop_mark_boxes(card_w, card_h, slots[:len(chunk)], crop_len, crop_gap, crop_stroke_px):
+                draw.rectangle(box, fill=crop_color)
 
         # PASS 2 — paste all images on top (with border applied and offset)
-        for _, img_bytes, x, y in positions:
-            with PILImage.open(BytesIO(img_bytes)) as im:
-                im = im.convert("RGB").resize((card_w, card_h), PILImage.LANCZOS)
-                off = 0
-                if add_border and border_px > 0:
-                    im = ImageOps.expand(im, border=border_px, fill=border_color)
-                    off = border_px
-                page.paste(im, (x - off, y - off))
-        pages.append(page)
-    return pages
+        for i, img_bytes in enumerate(chunk):
+            x, y = slots[i]
+            n = page_idx*9 + i; key = keys[n]
+            tile = tiles.get(key)
+            if tile is None:
+                tile = tiles[key] = _a4_card_tile(img_bytes, card_w, card_h, add_border, border_px, border_color)
+                stats["tiles_decoded"] += 1
+            else:
+                stats["tile_cache_hits"] += 1
+            im, off = tile
+            page.paste(im, (x - off, y - off))
+            if last_use[key] == n: del tiles[key]
+        TRACE.add("page", t_page, time.perf_counter() - t_page, {"cards": len(chunk)})
+        yield page
+        del page
+
+def a4_band_px(dpi: int, band_mb: int) -> int:
+    """Rows per band so one RGB band stays within band_mb; 0 if a whole page already fits."""
+    row = mm_to_px(210, dpi) * 3
+    if band_mb <= 0 or row * mm_to_px(297, dpi) <= band_mb * 1048576: return 0
+    return max(16, band_mb * 1048576 // row // 16 * 16)   # multiple of 16: JPEG strips end on whole MCUs
+
+def iter_a4_bands(images: List[bytes], dpi: int,
+                  card_w_mm: float, card_h_mm: float,
+                  margin_x_mm: float, margin_y_mm: float,
+                  gap_x_mm: float, gap_y_mm: float,
+                  crop_marks: bool = False, crop_len_mm: float = 2.5, crop_gap_mm: float = 0.8,
+                  crop_stroke_px: int = 1, crop_color=(0,0,0),
+                  add_border: bool = False, border_px: int = 0, border_color: str = 'white',
+                  band_px: int = 1024, stats: Optional[dict] = None
+                  ) -> Iterator[Tuple[int, int, Iterator[Tuple[int, PILImage.Image]]]]:
+    """
+    Same sheets as iter_a4_pages, composed in horizontal bands of band_px rows (resizing only
+    the rows a band needs can round a few pixels 1/255 differently from the whole-card resize).
+    Yields (page_w, page_h, bands) per page; bands yields (y, band image) top to bottom
+    and must be consumed before the next page is requested. Cards are kept decoded at
+    their source size and only the rows a band needs are resized (Image.resize box),
+    so memory is one band plus the decoded sources, never a full page or full tiles.
+    """
+    page_w, page_h, card_w, card_h, slots = a4_geometry(dpi, card_w_mm, card_h_mm, margin_x_mm, margin_y_mm,
+                                                        gap_x_mm, gap_y_mm)
+    crop_len = mm_to_px(crop_len_mm, dpi); crop_gap = mm_to_px(crop_gap_mm, dpi)
+    off = border_px if add_border and border_px > 0 else 0
+    keys = _content_keys(images)
+    last_use = {k: n for n, k in enumerate(keys)}
+    sources: Dict[str, PILImage.Image] = {}
+    if stats is None: stats = {}
+    stats["tiles_decoded"] = stats["tile_cache_hits"] = 0
+
+    for page_idx in range(0, math.ceil(len(images)/9)):
+        placed = []
+        for i, img_bytes in enumerate(images[page_idx*9:(page_idx+1)*9]):
+            n = page_idx*9 + i; key = keys[n]
+            if key not in sources:
+                with PILImage.open(BytesIO(img_bytes)) as im:
+                    with TRACE.span("decode"): sources[key] = im.convert("RGB")
+                stats["tiles_decoded"] += 1
+            else:
+                stats["tile_cache_hits"] += 1
+            placed.append((n, key) + slots[i])
+
+        def bands() -> Iterator[Tuple[int, PILImage.Image]]:
+            for y0 in range(0, page_h, band_px):
+                t_band = time.perf_counter()
+                bh = min(band_px, page_h - y0)
+                band = PILImage.new("RGB", (page_w, bh), "white"); draw = ImageDraw.Draw(band)
+                if crop_marks:
+                    for x0, t, x1, b in crop_mark_boxes(card_w, card_h, slots[:len(placed)], crop_len, crop_gap,
+                                                        crop_stroke_px):
+                        if b >= y0 and t < y0 + bh: draw.rectangle((x0, t - y0, x1, b - y0), fill=crop_color)
+                for _, key, x, y in placed:
+                    if y - off >= y0 + bh or y + card_h + off <= y0: continue
+                    if off:
+                        draw.rectangle([x - off, y - off - y0, x + card_w + off - 1, y + card_h + off - 1 - y0],
+                                       fill=border_color)
+                    r0 = max(0, y0 - y); r1 = min(card_h, y0 + bh - y)
+                    if r1 <= r0: continue
+                    src = sources[key]; sy = src.height / card_h
+                    with TRACE.span("resize", size=f"{card_w}x{r1 - r0}"):
+                        strip = src.resize((card_w, r1 - r0), PILImage.LANCZOS, box=(0, r0 * sy, src.width, r1 * sy))
+                    band.paste(strip, (x, y + r0 - y0)); strip.close()
+                TRACE.add("band", t_band, time.perf_counter() - t_band, {"y": y0, "rows": bh})
+                yield y0, band
+                band.close()
+
+        yield page_w, page_h, bands()
+        for n, key, _, __ in placed:
+            if last_use[key] == n: sources.pop(key).close()
+
+def build_a4_pages(images: List[bytes], dpi: int,
+                   card_w_mm: float, card_h_mm: float,
+                   margin_x_mm: float, margin_y_mm: float,
+                   gap_x_mm: float, gap_y_mm: float,
+                   crop_marks: bool = False, crop_len_mm: float = 2.5, crop_gap_mm: float = 0.8,
+                   crop_stroke_px: int = 1, crop_color=(0,0,0),
+                   add_border: bool = False, border_px: int = 0, border_color: str = 'white',
+                   stats: Optional[dict] = None) -> List[PILImage.Image]:
+    return list(iter_a4_pages(images, dpi, card_w_mm, card_h_mm, margin_x_mm, margin_y_mm, gap_x_mm, gap_y_mm,
+                              crop_marks, crop_len_mm, crop_gap_mm, crop_stroke_px, crop_color,
+                              add_border, border_px, border_color, stats=stats))
+
+# -------- PDF output --------
+class PdfWriter:
+    """
+    Minimal streaming PDF writer: every object is written to disk as soon as it is
+    added, only the xref offsets are kept in memory. Pages and images are enough
+    for the A4 sheets (images are passed in already encoded, e.g. as JPEG).
+    """
+    def __init__(self, path: str):
+        self.path = path; self.f = open(path, "wb")
+        self.offsets: Dict[int, int] = {}; self.page_refs: List[int] = []
+        self._next = 3   # 1 = catalog, 2 = page tree (written on close)
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _alloc(self) -> int:
+        n = self._next; self._next += 1; return n
+
+    def _obj(self, num: int, body: str, stream: Optional[bytes] = None) -> None:
+        self.offsets[num] = self.f.tell()
+        if stream is None:
+            self.f.write(f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+        else:
+            self.f.write(f"{num} 0 obj\n{body[:-2]} /Length {len(stream)} >>\nstream\n".encode("latin-1"))
+            self.f.write(stream); self.f.write(b"\nendstream\nendobj\n")
+
+    def add_image(self, data: bytes, w: int, h: int, filter: str = "DCTDecode",
+                  colorspace: str = "DeviceRGB") -> int:
+        num = self._alloc()
+        self._obj(num, f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} "
+                       f"/ColorSpace /{colorspace} /BitsPerComponent 8 /Filter /{filter} >>", data)
+        return num
+
+    def add_page(self, width_pt: float, height_pt: float, content: bytes, images: Dict[str, int]) -> None:
+        cnum = self._alloc(); self._obj(cnum, "<< >>", content)
+        xobj = " ".join(f"/{name} {ref} 0 R" for name, ref in images.items())
+        pnum = self._alloc()
+        self._obj(pnum, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.4f} {height_pt:.4f}] "
+                        f"/Resources << /ProcSet [/PDF /ImageC] /XObject << {xobj} >> >> /Contents {cnum} 0 R >>")
+        self.page_refs.append(pnum)
+
+    def add_raster_page(self, jpeg: bytes, w: int, h: int, dpi: int) -> None:
+        """One full-page JPEG image, the same layout Pillow's PDF writer produces."""
+        with TRACE.span("write", file=os.path.basename(self.path)):
+            ref = self.add_image(jpeg, w, h)
+            wpt, hpt = w * 72.0 / dpi, h * 72.0 / dpi
+            self.add_page(wpt, hpt, f"q {wpt:.4f} 0 0 {hpt:.4f} 0 0 cm /image Do Q".encode("latin-1"), {"image": ref})
+
+    def add_raster_bands(self, bands: Iterable[Tuple[bytes, int, int, int]], page_w: int, page_h: int, dpi: int) -> None:
+        """
+        One page assembled from JPEG strips (jpeg, w, h, y in pixels from the top), stacked
+        without gaps. Each strip is written as soon as the iterable yields it.
+        """
+        k = 72.0 / dpi; placed = []; refs: Dict[str, int] = {}
+        for jpeg, w, h, y in bands:
+            with TRACE.span("write", file=os.path.basename(self.path)):
+                ref = self.add_image(jpeg, w, h)
+            refs[f"band{len(refs)}"] = ref
+            placed.append(f"q {w * k:.4f} 0 0 {h * k:.4f} 0 {(page_h - y - h) * k:.4f} cm /band{len(refs) - 1} Do Q")
+        with TRACE.span("write", file=os.path.basename(self.path)):
+            self.add_page(page_w * k, page_h * k, "\n".join(placed).encode("latin-1"), refs)
+
+    def close(self) -> None:
+        kids = " ".join(f"{p} 0 R" for p in self.page_refs)
+        self._obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_refs)} >>")
+        self._obj(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self.f.tell(); size = self._next
+        self.f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1"))
+        for n in range(1, size):
+            off = self.offsets.get(n)
+            self.f.write((f"{off:010d} 00000 n \n" if off is not None else "0000000000 65535 f \n").encode("latin-1"))
+        self.f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+        self.f.close()
+
+PNG_SLICE_BYTES = 8 * 1048576
+
+class PngStreamWriter:
+    """
+    RGB PNG written band by band: all IDAT chunks share one zlib stream, so only the
+    current band is ever in memory. Rows use the PNG "Up" filter, computed for the whole
+    band at once with ImageChops.subtract_modulo against the band shifted down one row.
+    """
+    def __init__(self, path: str, width: int, height: int, compress_level: int = 9):
+        self.path = path; self.width = width; self.f = _TimedFile(path)
+        self.z = zlib.compressobj(compress_level); self.prev = PILImage.new("RGB", (width, 1))   # row -1 is zero
+        self.f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self.f.write(struct.pack(">I", len(data)) + kind); self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xffffffff))
+
+    def add_band(self, band: PILImage.Image) -> None:
+        w, h = band.size; stride = w * 3
+        step = max(1, PNG_SLICE_BYTES // stride)   # filter + compress a few MB at a time, not the whole band
+        for r0 in range(0, h, step):
+            r1 = min(h, r0 + step)
+            with TRACE.span("encode", format="PNG band"):
+                rows_im = band.crop((0, r0, w, r1))
+                above = PILImage.new("RGB", (w, r1 - r0)); above.paste(self.prev, (0, 0))
+                if r1 - r0 > 1: above.paste(band.crop((0, r0, w, r1 - 1)), (0, 1))
+                self.prev = band.crop((0, r1 - 1, w, r1))
+                raw = memoryview(ImageChops.subtract_modulo(rows_im, above).tobytes())
+                rows: List = []
+                for i in range(0, len(raw), stride): rows += (b"\x02", raw[i:i + stride])
+                data = self.z.compress(b"".join(rows))
+            if data: self._chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        try:
+            self._chunk(b"IDAT", self.z.flush()); self._chunk(b"IEND", b"")
+        finally:
+            self.f.close()
+            TRACE.add("write", time.perf_counter() - self.f.sec, self.f.sec, {"file": os.path.basename(self.path)})
+
+# Vector sheets: cards are embedded as image XObjects (each distinct card once) and placed at
+# their slot; crop marks and borders are PDF paths. Sizes are exact millimetres, the DPI only
+# caps the resolution of re-encoded cards and converts stroke/border pixels to points.
+PT_PER_MM = 72.0 / 25.4
+PDF_PASSTHROUGH_SCALE = 1.5   # embed JPEGs untouched unless they exceed the slot at this DPI by more than this
+
+def _pdf_card_image(img_bytes: bytes, max_w: int, max_h: int) -> Tuple[bytes, int, int, str]:
+    """
+    Image stream for one card → (data, width, height, colorspace), DCTDecode. Baseline RGB/gray
+    JPEGs that are not much larger than the slot are embedded byte for byte; anything else is
+    decoded, downscaled to the slot (never upscaled) and encoded as a high-quality JPEG.
+    """
+    with PILImage.open(BytesIO(img_bytes)) as im:
+        w, h = im.size
+        if (im.format == "JPEG" and im.mode in ("RGB", "L")
+                and w <= max_w * PDF_PASSTHROUGH_SCALE and h <= max_h * PDF_PASSTHROUGH_SCALE):
+            return img_bytes, w, h, "DeviceGray" if im.mode == "L" else "DeviceRGB"
+        with TRACE.span("decode"): im = im.convert("RGB")
+        if w > max_w or h > max_h:
+            with TRACE.span("resize", size=f"{max_w}x{max_h}"):
+                im = im.resize((min(w, max_w), min(h, max_h)), PILImage.LANCZOS)
+        with TRACE.span("encode", format="JPEG (PDF card)"):
+            buf = BytesIO(); im.save(buf, "JPEG", quality=95, subsampling=0)
+        return buf.getvalue(), im.width, im.height, "DeviceRGB"
+
+def _pdf_rgb(color) -> str:
+    r, g, b = ImageColor.getrgb(color)[:3] if isinstance(color, str) else tuple(color)[:3]
+    return f"{r / 255:.4f} {g / 255:.4f} {b / 255:.4f}"
+
+def write_vector_pdf(images: List[bytes], path: str, dpi: int,
+                     card_w_mm: float, card_h_mm: float,
+                     margin_x_mm: float, margin_y_mm: float,
+                     gap_x_mm: float, gap_y_mm: float,
+                     crop_marks: bool = False, crop_len_mm: float = 2.5, crop_gap_mm: float = 0.8,
+                     crop_stroke_px: int = 1, crop_color=(0,0,0),
+                     add_border: bool = False, border_px: int = 0, border_color: str = 'white',
+                     stats: Optional[dict] = None, on_page: Optional[Callable[[int], None]] = None,
+                     should_stop: Optional[Callable[[], bool]] = None) -> str:
+    """
+    A4 3×3 sheets as a vector PDF with the same layout as iter_a4_pages (crop marks under
+    the cards, border around each card). Takes the iter_a4_pages layout arguments.
+    stats receives "tiles_decoded" (cards embedded) and "tile_cache_hits" (reused references).
+    """
+    mm = PT_PER_MM; px = 72.0 / dpi
+    page_w, page_h = 210 * mm, 297 * mm
+    card_w, card_h = card_w_mm * mm, card_h_mm * mm
+    margin_x, margin_y = margin_x_mm * mm, margin_y_mm * mm
+    gap_x, gap_y = gap_x_mm * mm, gap_y_mm * mm
+    cols, rows = 3, 3
+    needed_w = 2*margin_x + cols*card_w + (cols-1)*gap_x
+    needed_h = 2*margin_y + rows*card_h + (rows-1)*gap_y
+    if needed_w > page_w: gap_x = max(0.0, gap_x - (needed_w - page_w) / (cols-1))
+    if needed_h > page_h: gap_y = max(0.0, gap_y - (needed_h - page_h) / (rows-1))
+    max_w, max_h = mm_to_px(card_w_mm, dpi), mm_to_px(card_h_mm, dpi)
+    border = max(0, int(border_px)) * px if add_border else 0.0
+    stroke = max(1, int(crop_stroke_px)) * px
+    crop_len, crop_gap = max(0.0, crop_len_mm) * mm, max(0.0, crop_gap_mm) * mm
+
+    if stats is None: stats = {}
+    stats["tiles_decoded"] = stats["tile_cache_hits"] = 0
+    refs: Dict[str, int] = {}; keys = _content_keys(images)
+    pdf = PdfWriter(path)
+    try:
+        for page_idx in range(math.ceil(len(images) / 9)):
+            if should_stop and should_stop(): break
+            t_page = time.perf_counter()
+            chunk = images[page_idx*9:(page_idx+1)*9]
+            slots = []; used: Dict[str, int] = {}
+            for i, img_bytes in enumerate(chunk):
+                key = keys[page_idx*9 + i]; ref = refs.get(key)
+                if ref is None:
+                    data, w, h, cs = _pdf_card_image(img_bytes, max_w, max_h)
+                    with TRACE.span("write", file=os.path.basename(path)):
+                        ref = refs[key] = pdf.add_image(data, w, h, colorspace=cs)
+                    stats["tiles_decoded"] += 1
+                else:
+                    stats["tile_cache_hits"] += 1
+                used[f"Im{ref}"] = ref
+                r = i // cols; c = i % cols
+                slots.append((f"Im{ref}", margin_x + c * (card_w + gap_x), margin_y + r * (card_h + gap_y)))
+
+            # Page space is y-up; the layout is computed top-down like the raster pages.
+            ops: List[str] = []
+            if crop_marks:
+                ops.append(f"q {_pdf_rgb(crop_color)} RG {stroke:.4f} w 0 J")
+                for _, x, y in slots:
+                    for kind, a1, a2, b in crop_mark_segments(x, y, card_w, card_h, crop_len, crop_gap):
+                        if kind == "h": ops.append(f"{a1:.3f} {page_h - b:.3f} m {a2:.3f} {page_h - b:.3f} l S")
+                        else: ops.append(f"{a1:.3f} {page_h - a2:.3f} m {a1:.3f} {page_h - b:.3f} l S")
+                ops.append("Q")
+            if border > 0:
+                ops.append(f"q {_pdf_rgb(border_color)} rg")
+                for _, x, y in slots:
+                    ops.append(f"{x - border:.3f} {page_h - y - card_h - border:.3f} "
+                               f"{card_w + 2*border:.3f} {card_h + 2*border:.3f} re f")
+                ops.append("Q")
+            for name, x, y in slots:
+                ops.append(f"q {card_w:.3f} 0 0 {card_h:.3f} {x:.3f} {page_h - y - card_h:.3f} cm /{name} Do Q")
+            with TRACE.span("write", file=os.path.basename(path)):
+                pdf.add_page(page_w, page_h, "\n".join(ops).encode("latin-1"), used)
+            TRACE.add("page", t_page, time.perf_counter() - t_page, {"cards": len(chunk)})
+            if on_page: on_page(page_idx + 1)
+    finally:
+        pdf.close()
+    return path
+
+def _encode_a4_page(page: PILImage.Image, fmt: str, path: Optional[str], png_profile: str = DEFAULT_PNG_PROFILE):
+    """Encode one finished page: PDF → (w, h, JPEG bytes) for PdfWriter, PNG/JPG → written to path."""
+    if fmt == "PDF":
+        with TRACE.span("encode", format="JPEG (PDF page)"):
+            buf = BytesIO(); page.convert("RGB").save(buf, "JPEG")
+        return (page.width, page.height, buf.getvalue())
+    if fmt == "PNG": save_image_timed(page, path, "PNG", **png_params(png_profile))
+    else: save_image_timed(page, path, "JPEG", quality=95, subsampling=0, optimize=True)
+    return path
+
+def _jpeg_bands(bands: Iterable[Tuple[int, PILImage.Image]]) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Band images → JPEG strips for PdfWriter.add_raster_bands."""
+    for y, band in bands:
+        with TRACE.span("encode", format="JPEG (PDF band)"):
+            buf = BytesIO(); band.save(buf, "JPEG")
+        yield buf.getvalue(), band.width, band.height, y
+
+def _png_bands(bands: Iterable[Tuple[int, PILImage.Image]], path: str, page_w: int, page_h: int,
+               png_profile: str) -> str:
+    png = PngStreamWriter(path, page_w, page_h, png_params(png_profile).get("compress_level", 9))
+    try:
+        for _, band in bands: png.add_band(band)
+    finally:
+        png.close()
+    return path
+
+def _a4_page_job(chunk: List[bytes], layout: dict, fmt: str, path: Optional[str], png_profile: str,
+                 band_px: int = 0):
+    """Process-pool worker: compose + encode one page (top-level so it pickles)."""
+    stats: Dict[str, int] = {}; TRACE.take()
+    if band_px:
+        page_w, page_h, bands = next(iter_a4_bands(chunk, band_px=band_px, stats=stats, **layout))
+        if fmt == "PNG": res = _png_bands(bands, path, page_w, page_h, png_profile)
+        else: res = (page_w, page_h, list(_jpeg_bands(bands)))
+        return res, stats, TRACE.take()
+    page = next(iter_a4_pages(chunk, stats=stats, **layout))
+    try: return _encode_a4_page(page, fmt, path, png_profile), stats, TRACE.take()
+    finally: page.close()
+
+def save_a4_pages(pages: Iterable[PILImage.Image], fmt: str, target_dir: str, base_name: str, dpi: int,
+                  on_page: Optional[Callable[[int], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None,
+                  png_profile: str = DEFAULT_PNG_PROFILE) -> List[str]:
+    """
+    Write pages as they arrive: PDF pages are appended to one file, PNG/JPG pages
+    become one file each. Every page is closed right after writing, so peak memory
+    stays at about one page regardless of the deck size. When should_stop() turns
+    true the pages written so far are kept (the PDF is closed properly).
+    """
+    fmt = fmt.upper(); written: List[str] = []
+    pdf = PdfWriter(next_unique(target_dir, f"A4_{base_name}", ".pdf")) if fmt == "PDF" else None
+    try:
+        for i, page in enumerate(pages, 1):
+            if should_stop and should_stop(): page.close(); break
+            try:
+                if pdf:
+                    w, h, jpeg = _encode_a4_page(page, fmt, None)
+                    pdf.add_raster_page(jpeg, w, h, dpi)
+                else:
+                    ext = ".png" if fmt == "PNG" else ".jpg"
+                    written.append(_encode_a4_page(page, fmt, next_unique(target_dir, f"A4_{base_name}_{i:03d}", ext),
+                                                   png_profile))
+            finally:
+                page.close()
+            if on_page: on_page(i)
+    finally:
+        if pdf: pdf.close(); written.insert(0, pdf.path)
+    return written
+
+def save_a4_bands(pages: Iterable[Tuple[int, int, Iterator[Tuple[int, PILImage.Image]]]], fmt: str,
+                  target_dir: str, base_name: str, dpi: int,
+                  on_page: Optional[Callable[[int], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None,
+                  png_profile: str = DEFAULT_PNG_PROFILE) -> List[str]:
+    """save_a4_pages for iter_a4_bands: PNG pages and PDF strips are streamed band by band."""
+    fmt = fmt.upper(); written: List[str] = []
+    pdf = PdfWriter(next_unique(target_dir, f"A4_{base_name}", ".pdf")) if fmt == "PDF" else None
+    try:
+        for i, (page_w, page_h, bands) in enumerate(pages, 1):
+            if should_stop and should_stop(): break
+            if pdf: pdf.add_raster_bands(_jpeg_bands(bands), page_w, page_h, dpi)
+            else: written.append(_png_bands(bands, next_unique(target_dir, f"A4_{base_name}_{i:03d}", ".png"),
+                                            page_w, page_h, png_profile))
+            if on_page: on_page(i)
+    finally:
+        if pdf: pdf.close(); written.insert(0, pdf.path)
+    return written
+
+def export_a4_sheets(images: List[bytes], layout: dict, fmt: str, target_dir: str, base_name: str,
+                     workers: int = 1, on_page: Optional[Callable[[int], None]] = None,
+                     stats: Optional[dict] = None, should_stop: Optional[Callable[[], bool]] = None,
+                     png_profile: str = DEFAULT_PNG_PROFILE, band_mb: int = 0) -> List[str]:
+    """
+    Render + write all sheets. "PDF" is the vector PDF (write_vector_pdf); "PDF (raster)",
+    PNG and JPG compose whole pages at the DPI. For those, workers > 1 composes and encodes
+    pages in a process pool (at most 2×workers pages in flight); results are consumed in page
+    order, so file names and PDF page order are identical to the single-core path.
+    layout holds the iter_a4_pages keyword arguments (dpi, sizes, crop marks, border).
+    PNG and raster PDF pages bigger than band_mb (RGB buffer) are composed and written in
+    bands of at most band_mb (iter_a4_bands); JPG pages are always composed whole.
+    """
+    fmt = fmt.upper(); dpi = layout["dpi"]
+    n_pages = math.ceil(len(images) / 9)
+    if fmt == "PDF":
+        return [write_vector_pdf(images, next_unique(target_dir, f"A4_{base_name}", ".pdf"), stats=stats,
+                                 on_page=on_page, should_stop=should_stop, **layout)]
+    if fmt == "PDF (RASTER)": fmt = "PDF"
+    band_px = a4_band_px(dpi, band_mb) if fmt in ("PNG", "PDF") else 0
+    if workers <= 1 or n_pages < 2:
+        if band_px:
+            return save_a4_bands(iter_a4_bands(images, band_px=band_px, stats=stats, **layout), fmt, target_dir,
+                                 base_name, dpi, on_page, should_stop, png_profile)
+        return save_a4_pages(iter_a4_pages(images, stats=stats, **layout), fmt, target_dir, base_name, dpi,
+                             on_page, should_stop, png_profile)
+    if stats is None: stats = {}
+    stats["tiles_decoded"] = stats["tile_cache_hits"] = 0
+    written: List[str] = []
+    pdf = PdfWriter(next_unique(target_dir, f"A4_{base_name}", ".pdf")) if fmt == "PDF" else None
+    ext = ".png" if fmt == "PNG" else ".jpg"
+    paths = [None if pdf else next_unique(target_dir, f"A4_{base_name}_{i:03d}", ext) for i in range(1, n_pages + 1)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            inflight: Dict[int, Future] = {}; nxt = 0
+            for i in range(n_pages):
+                if should_stop and should_stop():
+                    # Pages already being written to disk are finished and kept; queued ones are dropped.
+                    for j in sorted(inflight):
+                        if not inflight[j].cancel() and not pdf: written.append(inflight[j].result()[0])
+                    break
+                while nxt < n_pages and nxt < i + 2 * workers:
+                    inflight[nxt] = pool.submit(_a4_page_job, images[nxt*9:(nxt+1)*9], layout, fmt, paths[nxt],
+                                                png_profile, band_px); nxt += 1
+                res, st, spans = inflight.pop(i).result()
+                for k, v in st.items(): stats[k] = stats.get(k, 0) + v
+                TRACE.merge(*spans)
+                if pdf and band_px: pdf.add_raster_bands(res[2], res[0], res[1], dpi)
+                elif pdf: pdf.add_raster_page(res[2], res[0], res[1], dpi)
+                else: written.append(res)
+                if on_page: on_page(i + 1)
+    finally:
+        if pdf: pdf.close(); written.insert(0, pdf.path)
+    return written
 
 def ensure_unique_suffix(path: str) -> str:
     base, ext = os.path.splitext(path); candidate = path; n = 1
@@ -477,56 +2133,426 @@ def next_unique(target_dir: str, name: str, ext: str) -> str:
 def looks_like_op_code(s: str) -> bool:
     return re.fullmatch(r"[A-Z]+\d{2}-\d{3}", s.strip().upper()) is not None
 
-def probe_all_arts(game: str, term: str, source: str, local_dir: Optional[str] = None) -> List[Tuple[str, bytes]]:
+def _term_key(kind: str, game: str, term: str, source: str, local_dir: Optional[str]) -> tuple:
+    return (kind, game, source, term.strip().lower(), local_dir if source == "local" else None)
+
+def art_candidates(game: str, term: str, source: str, local_dir: Optional[str] = None) -> Iterator[ArtCandidate]:
+    """Lazy stream of the arts a source offers for one list entry (nothing downloaded yet)."""
     term = term.strip()
     if source == "local":
-        if not local_dir or not os.path.isdir(local_dir): return []
-        out: List[Tuple[str, bytes]] = []
-        for p in candidates_local_by_code_or_name(term, local_dir):
-            try:
-                with open(p, "rb") as f: out.append((p, f.read()))
-            except Exception: pass
-        return out
+        if local_dir and os.path.isdir(local_dir): return local_candidates(term, local_dir)
+        return iter(())
     if game == "One Piece":
-        if looks_like_op_code(term):
-            urls = (candidates_dotgg(term) if source == "dotgg" else candidates_limitless(term))
-            return probe_urls_in_parallel(urls)
-        else:
-            return []
+        if looks_like_op_code(term): return op_candidates(term, source)
     elif game == "Yu-Gi-Oh!":
-        if source == "ygoprodeck": return fetch_ygo_images(term)
+        if source == "ygoprodeck": return ygo_candidates(term)
     elif game == "Pokémon":
-        if source == "pkmncards": return fetch_pokemon_images(term)
+        if source == "pkmncards": return pokemon_candidates(term)
     elif game == "MTG":
-        if source == "scryfall": return fetch_mtg_images(term)
-    return []
+        if source == "scryfall": return mtg_candidates(term)
+    return iter(())
+
+def probe_all_arts(game: str, term: str, source: str, local_dir: Optional[str] = None) -> List[ArtCandidate]:
+    """Up to MAX_ARTS candidates for the art picker; their bytes load when the picker shows them."""
+    cands = RUN_FLIGHT.do(_term_key("probe", game, term, source, local_dir),
+                          lambda: list(itertools.islice(art_candidates(game, term, source, local_dir), MAX_ARTS)))
+    # Fresh copies: the list kept for repeats in this run never holds downloaded bytes itself.
+    return [ArtCandidate(c.url, c.thumb_url, c.headers, c.on_missing) for c in cands]
 
 def download_card_default(game: str, term: str, source: str, local_dir: Optional[str]) -> bytes:
+    return RUN_FLIGHT.do(_term_key("default", game, term, source, local_dir),
+                         _download_card_default, game, term, source, local_dir)
+
+def _download_card_default(game: str, term: str, source: str, local_dir: Optional[str]) -> bytes:
     term = term.strip()
     if source == "local":
-        paths = candidates_local_by_code_or_name(term, local_dir or ".")
-        if not paths: raise RuntimeError(f"No local image found for '{term}'.")
-        with open(paths[0], "rb") as f: return f.read()
+        data = first_image(local_candidates(term, local_dir or "."))
+        if data is None: raise RuntimeError(f"No local image found for '{term}'.")
+        return data
     if game == "One Piece":
         if not looks_like_op_code(term): raise RuntimeError("For One Piece online sources, please use a code like OP11-040.")
-        urls = (candidates_dotgg(term) if source == "dotgg" else candidates_limitless(term))
-        for url in urls:
+        key = op_variant_key(term, source); known = OP_VARIANTS.get(key) or []
+        for url in known:
             data = request_ok(url)
             if data: return data
+            OP_VARIANTS.forget(key)           # a known variant vanished: probe again next time
+        # Only the picker needs every variant (HEAD probe); here the first image that
+        # downloads wins, so the candidates are fetched in order and the rest never asked.
+        data = first_image(ArtCandidate(u) for u in op_candidate_urls(term, source) if u not in known)
+        if data: return data
         raise RuntimeError(f"No image found for code {term} on source '{source}'.")
-    if game == "Yu-Gi-Oh!" and source == "ygoprodeck":
-        imgs = fetch_ygo_images(term)
-        if imgs: return imgs[0][1]
-        raise RuntimeError(f"No image found for Yu-Gi-Oh! name '{term}'.")
-    if game == "Pokémon" and source == "pkmncards":
-        imgs = fetch_pokemon_images(term)
-        if imgs: return imgs[0][1]
-        raise RuntimeError(f"No image found for Pokémon name '{term}'.")
-    if game == "MTG" and source == "scryfall":
-        imgs = fetch_mtg_images(term)
-        if imgs: return imgs[0][1]
-        raise RuntimeError(f"No image found for MTG name '{term}'.")
-    raise RuntimeError("Unsupported combination.")
+    labels = {("Yu-Gi-Oh!", "ygoprodeck"): "Yu-Gi-Oh! name", ("Pokémon", "pkmncards"): "Pokémon name",
+              ("MTG", "scryfall"): "MTG name"}
+    if (game, source) not in labels: raise RuntimeError("Unsupported combination.")
+    # Only the first art that downloads is fetched; the remaining prints are never requested.
+    data = first_image(art_candidates(game, term, source, local_dir))
+    if data is None: raise RuntimeError(f"No image found for {labels[(game, source)]} '{term}'.")
+    return data
+
+# -------- List processing (GUI and batch) --------
+CROP_COLORS = {"Black": (0,0,0), "Red": (230,0,0), "Green": (0,170,0), "Blue": (30,90,255)}
+
+# Same keys and start values as the GUI (see _collect_settings_dict); missing keys in a
+# settings file fall back to these.
+DEFAULT_SETTINGS = {
+    "game": GAMES[0], "source": SOURCES_BY_GAME[GAMES[0]][0][0], "local_dir": "", "save_folder": "",
+    "out_mode": "a4sheet", "a4_fmt": "PDF", "dpi": 1500,
+    "card_w_mm": 63, "card_h_mm": 88, "margin_x_mm": 7, "margin_y_mm": 13, "gap_x_mm": 3, "gap_y_mm": 3,
+    "crop_enabled": True, "crop_len_mm": 300, "crop_gap_mm": 0, "crop_stroke_px": 1, "crop_color": "Black",
+    "border": False, "border_px": 50, "border_color": "white", "upscale": False, "min_height": 1500,
+    "multiply": True, "choose_art": True, "overwrite": False,
+    "cache_enabled": True, "cache_max_mb": CACHE_MAX_MB, "parallel_lines": True, "line_workers": LINE_WORKERS,
+    "render_workers": RENDER_WORKERS, "write_trace": False, "png_profile": DEFAULT_PNG_PROFILE,
+    "band_mb": BAND_MB,
+}
+
+class JobControl:
+    """Pause/cancel switch and progress counters shared by a running process_list() and the UI."""
+    def __init__(self):
+        self._cancel = threading.Event(); self._go = threading.Event(); self._go.set()
+        self.done = 0; self.total = 0; self.started = time.time()
+        self._paused_at: Optional[float] = None; self._paused_sec = 0.0
+
+    @property
+    def cancelled(self) -> bool: return self._cancel.is_set()
+    @property
+    def paused(self) -> bool: return not self._go.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set(); self.resume()
+
+    def pause(self) -> None:
+        if self._paused_at is None: self._paused_at = time.time(); self._go.clear()
+
+    def resume(self) -> None:
+        if self._paused_at is not None: self._paused_sec += time.time() - self._paused_at; self._paused_at = None
+        self._go.set()
+
+    def checkpoint(self) -> bool:
+        """Blocks while paused; False once the job is cancelled."""
+        self._go.wait(); return not self._cancel.is_set()
+
+    def active_sec(self) -> float:
+        now = time.time(); paused = self._paused_sec + (now - self._paused_at if self._paused_at else 0.0)
+        return max(1e-6, now - self.started - paused)
+
+def normalize_folder(p: str) -> str:
+    p = p.strip().strip('"').strip("'")
+    return os.path.normpath(os.path.abspath(p))
+
+def parse_list_line(txt: str, game: str) -> Optional[Tuple[int, str, str]]:
+    """'4x Pikachu ex' → (qty, search term, display name); None for blank lines."""
+    txt = txt.strip()
+    if not txt: return None
+    m = re.match(r'\s*(\d+)\s*(?:[x×]\s*)?(.+?)\s*$', txt, re.I)
+    if m: qty = int(m.group(1)); term = m.group(2).strip()
+    else: qty = 1; term = txt
+    display = term
+    if game == "One Piece" and looks_like_op_code(term): display = term.upper()
+    return qty, term, display
+
+def _unique_path(path: str, overwrite: bool, reserved=()) -> str:
+    if overwrite: return path
+    base, ext = os.path.splitext(path); candidate = path; n = 1
+    while os.path.exists(candidate) or candidate in reserved: candidate = f"{base} ({n}){ext}"; n += 1
+    return candidate
+
+def process_list(lines: List[str], settings: dict, target_dir: str,
+                 pick_art: Optional[Callable[[str, List[ArtCandidate]], Optional[bytes]]] = None,
+                 progress: Optional[Callable[[str], None]] = None,
+                 control: Optional[JobControl] = None, run_stats: bool = True) -> dict:
+    """
+    Resolve → fetch → save_png / A4 sheets for one list, using a settings dict in the
+    format written by "Save As". pick_art(display, candidates) is asked when art
+    selection is on (without it, the first image is used). control (optional) pauses or
+    cancels the run between cards/pages; files written before a cancel are kept and
+    reported. Returns a report dict. run_stats=False leaves out the process-wide numbers
+    (dedup, cache, stage timings, trace) for callers running several lists at once.
+    """
+    cfg = dict(DEFAULT_SETTINGS); cfg.update(settings or {})
+    progress = progress or (lambda _msg: None)
+    t0 = time.time()
+    os.makedirs(target_dir, exist_ok=True)
+    success: List[str] = []; failed: List[dict] = []
+    total = len([ln for ln in lines if ln.strip()])
+    src = cfg["source"]; game = cfg["game"]
+    local_dir = normalize_folder(cfg["local_dir"]) if src == "local" else None
+    collected_for_a4: List[bytes] = []
+    first_title_for_sheet: Optional[str] = None
+    try: CACHE.configure(enabled=cfg["cache_enabled"], max_mb=int(cfg["cache_max_mb"]))
+    except Exception: CACHE.configure(enabled=cfg["cache_enabled"])
+    report: dict = {"target_dir": target_dir, "saved": success, "failed": failed}
+    if local_dir and os.path.isdir(local_dir):
+        progress("Updating local index …")
+        lidx = local_index_for(local_dir, refresh=True)
+        report["local_index"] = {"files": lidx.file_count, "dirs_read": lidx.dirs_read, "scan_sec": lidx.scan_sec}
+
+    # Parse all lines first so resolving can run ahead of the (ordered) save loop.
+    jobs = []
+    for idx, line in enumerate(lines, start=1):
+        parsed = parse_list_line(line, game)
+        if parsed: jobs.append((idx,) + parsed)
+    if control: control.total = len(jobs)
+
+    choose_art = bool(cfg["choose_art"]) and pick_art is not None
+    images_mode = cfg["out_mode"] == "images"
+    multiply = bool(cfg["multiply"]); overwrite = bool(cfg["overwrite"])
+    png_opts = dict(add_border=bool(cfg["border"]),
+                    border_px=max(0, int(cfg["border_px"])), border_color=cfg["border_color"],
+                    do_upscale=bool(cfg["upscale"]),
+                    min_height_px=max(1, int(cfg["min_height"])),
+                    dpi=max(72, int(cfg["dpi"])), profile=cfg["png_profile"])
+    parallel = bool(cfg["parallel_lines"])
+    try: workers = max(1, int(cfg["line_workers"]))
+    except Exception: workers = LINE_WORKERS
+
+    def resolve(term: str):
+        with TRACE.span("card", card=term):
+            if choose_art: return probe_all_arts(game, term, src, local_dir)
+            return download_card_default(game, term, src, local_dir)
+
+    # Bounded look-ahead: at most 2×workers lines are resolved ahead of the current one,
+    # so memory stays flat on long lists while the pool is kept busy.
+    pool = ThreadPoolExecutor(max_workers=workers) if parallel else None
+    ahead: Dict[int, Future] = {}; next_submit = 0
+    def fill_ahead(cur: int):
+        nonlocal next_submit
+        while pool and next_submit < len(jobs) and next_submit < cur + 2 * workers:
+            ahead[next_submit] = pool.submit(resolve, jobs[next_submit][2]); next_submit += 1
+    # Card PNGs are encoded on their own small pool, so encoding overlaps fetching the next
+    # cards even with parallel lines off; at most 2×ENCODE_WORKERS encodes wait at a time.
+    encoder = ThreadPoolExecutor(max_workers=ENCODE_WORKERS) if images_mode else None
+    saves = []; reserved = set(); writing: Dict[str, Future] = {}; failed_lines = set()
+
+    def fail(k: int, qty: int, display: str, e: Exception):
+        # One entry per failed line, as before; several copies of one line failing count once.
+        if k not in failed_lines: failed_lines.add(k); failed.append({"entry": f"{qty}x{display}", "error": str(e)})
+        print(f"[ERROR] {display}: {e}")
+
+    RUN_FLIGHT.begin(); TRACE.begin()
+    try:
+        for k, (idx, qty, term, display) in enumerate(jobs):
+            if control and not control.checkpoint(): report["cancelled"] = True; break
+            if control: control.done = k
+            if not first_title_for_sheet: first_title_for_sheet = display
+            effective_qty = qty if multiply else 1
+            progress(f"Processing {idx}/{total}: {display} …")
+            fill_ahead(k)
+
+            try:
+                result = ahead.pop(k).result() if pool else resolve(term)
+                if choose_art:
+                    variants = result
+                    if not variants:
+                        raise RuntimeError(f"No images found for {display}.\n(Hint: OP needs codes; others use names.)")
+                    if len(variants) == 1:
+                        chosen = variants[0].data
+                        if chosen is None: raise RuntimeError(f"No images found for {display}.")
+                    else:
+                        chosen = pick_art(display, variants) or None
+                    if chosen is None: continue
+                    img_bytes = chosen
+                else:
+                    img_bytes = result
+
+                if images_mode:
+                    for i in range(effective_qty):
+                        base = f"{display}_{i+1}" if effective_qty > 1 else display
+                        safe = re.sub(r'[^A-Za-z0-9_-]+', '_', base)[:60]
+                        out_file = _unique_path(os.path.join(target_dir, f"{safe}.png"), overwrite, reserved)
+                        reserved.add(out_file)
+                        # With "overwrite" two lines may target the same file; keep their input order.
+                        prev = writing.get(out_file)
+                        if prev: wait([prev])
+                        busy = [f for f, *_ in saves if not f.done()]
+                        if len(busy) >= 2 * ENCODE_WORKERS: wait(busy[:len(busy) - 2 * ENCODE_WORKERS + 1])
+                        writing[out_file] = fut = encoder.submit(save_png, img_bytes, out_file, **png_opts)
+                        saves.append((fut, out_file, k, qty, display))
+                else:
+                    for _ in range(effective_qty): collected_for_a4.append(img_bytes)
+
+            except Exception as e:
+                fail(k, qty, display, e)
+
+        if control and not report.get("cancelled"): control.done = len(jobs)
+        for fut, out_file, k, qty, display in saves:
+            try:
+                fut.result(); success.append(out_file)
+            except Exception as e:
+                fail(k, qty, display, e)
+    finally:
+        if pool: pool.shutdown(wait=True, cancel_futures=True)
+        if encoder: encoder.shutdown(wait=True)
+        if run_stats: report["dedup_saved"] = RUN_FLIGHT.saved
+        RUN_FLIGHT.end()
+
+    if cfg["out_mode"] == "a4sheet" and collected_for_a4 and not report.get("cancelled"):
+        dpi = max(72, int(cfg["dpi"]))
+        layout = dict(dpi=dpi,
+            card_w_mm=float(cfg["card_w_mm"]), card_h_mm=float(cfg["card_h_mm"]),
+            margin_x_mm=float(cfg["margin_x_mm"]), margin_y_mm=float(cfg["margin_y_mm"]),
+            gap_x_mm=float(cfg["gap_x_mm"]), gap_y_mm=float(cfg["gap_y_mm"]),
+            crop_marks=bool(cfg["crop_enabled"]),
+            crop_len_mm=float(cfg["crop_len_mm"]), crop_gap_mm=float(cfg["crop_gap_mm"]),
+            crop_stroke_px=int(cfg["crop_stroke_px"]), crop_color=CROP_COLORS.get(cfg["crop_color"], (0,0,0)),
+            add_border=bool(cfg["border"]), border_px=int(cfg["border_px"]), border_color=cfg["border_color"]
+        )
+        try: render_workers = max(1, int(cfg["render_workers"]))
+        except Exception: render_workers = RENDER_WORKERS
+        base_name = re.sub(r'[^A-Za-z0-9_-]+', '_', first_title_for_sheet or "sheet")
+        n_pages = math.ceil(len(collected_for_a4) / 9)
+        sheet_stats: Dict[str, int] = {}
+        def stop_sheets() -> bool:
+            if control and not control.checkpoint(): report["cancelled"] = True
+            return bool(report.get("cancelled"))
+        try:
+            success.extend(export_a4_sheets(collected_for_a4, layout, cfg["a4_fmt"], target_dir, base_name,
+                                            workers=render_workers, stats=sheet_stats, should_stop=stop_sheets,
+                                            png_profile=cfg["png_profile"], band_mb=max(0, int(cfg["band_mb"])),
+                                            on_page=lambda i: progress(f"Writing A4 page {i}/{n_pages} …")))
+        except Exception as e:
+            failed.append({"entry": "A4 sheets", "error": str(e)}); print(f"[ERROR] A4 sheets: {e}")
+        print(f"[INFO] A4 tiles: {sheet_stats.get('tiles_decoded', 0)} decoded, {sheet_stats.get('tile_cache_hits', 0)} reused")
+        report["sheet"] = sheet_stats
+
+    CACHE.flush()
+    out_bytes = 0
+    for p in success:
+        try: out_bytes += os.path.getsize(p)
+        except OSError: pass
+    png_out = images_mode or str(cfg["a4_fmt"]).upper() == "PNG"
+    report["output"] = {"png_profile": cfg["png_profile"] if png_out else None, "files": len(success), "bytes": out_bytes}
+    if run_stats: add_run_stats(report)
+    if cfg["write_trace"] and run_stats:
+        trace_path = os.path.join(target_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        try: TRACE.write_chrome_trace(trace_path); report["trace"] = trace_path
+        except Exception as e: print(f"[WARN] trace not written: {e}")
+    TRACE.end()
+    report["elapsed_sec"] = round(time.time() - t0, 3)
+    return report
+
+def add_run_stats(report: dict) -> None:
+    """Process-wide numbers of the current run (dedup, disk cache, stage timings) into report."""
+    report["cache"] = CACHE.stats() if CACHE.enabled else None
+    report["timings"] = TRACE.summary()
+    enc = report["timings"].get("encode") or {}
+    if report.get("output"):
+        report["output"].update(encode_sec=enc.get("total_sec", 0.0), encode_p50_ms=enc.get("p50_ms", 0.0))
+
+def format_report(report: dict) -> str:
+    """Human-readable summary of a process_list() report (done dialog / console)."""
+    msg = f"{len(report['saved'])} file(s) saved in:\n{report['target_dir']}"
+    if report.get("cancelled"): msg = "Cancelled – files written so far were kept.\n" + msg
+    if report["failed"]: msg += f"\nFailed: {', '.join(f['entry'] for f in report['failed'])}"
+    li = report.get("local_index")
+    if li:
+        msg += (f"\nLocal index: {li['files']} image(s), {li['dirs_read']} folder(s) re-read"
+                f" in {li['scan_sec']:.2f} s")
+    sheet = report.get("sheet") or {}
+    if sheet.get("tile_cache_hits"):
+        msg += (f"\nA4 cards: {sheet['tiles_decoded']} decoded/resized,"
+                f" {sheet['tile_cache_hits']} reused")
+    if report.get("dedup_saved"):
+        msg += f"\nDuplicates: {report['dedup_saved']} repeated lookup(s)/download(s) reused"
+    cs = report.get("cache")
+    if cs:
+        msg += (f"\nCache: {cs['hits']} hit(s), {cs['revalidated']} revalidated, {cs['misses']} miss(es)"
+                f" – {cs['bytes'] / 1048576:.0f} MB on disk")
+    out = report.get("output")
+    if out and out["files"]:
+        msg += f"\nOutput: {out['bytes'] / 1048576:.1f} MB"
+        if out["png_profile"] and "encode_sec" in out:
+            msg += (f", PNG profile '{out['png_profile']}', encoding {out['encode_sec']:.2f} s"
+                    f" ({out['encode_p50_ms']:.0f} ms per file, median)")
+    timings = report.get("timings") or {}
+    if timings:
+        msg += "\nTime per stage (total, p50 / p90 / max):"
+        for stage in ("card", "http", "decode", "resize", "page", "encode", "write"):
+            t = timings.get(stage)
+            if t: msg += (f"\n  {stage}: {t['total_sec']:.2f} s in {t['count']}×,"
+                          f" {t['p50_ms']:.0f} / {t['p90_ms']:.0f} / {t['max_ms']:.0f} ms")
+    if report.get("trace"): msg += f"\nTrace: {report['trace']}"
+    return msg
+
+# -------- Headless batch mode --------
+def batch_main(argv: List[str]) -> int:
+    """
+    python main.py batch --list deck.txt [--list more.txt …] --settings profile.json --out DIR
+    Runs the same pipeline as the GUI without Tk. Exit code 0 = everything saved,
+    1 = at least one card/list failed, 2 = bad arguments. A JSON report is always written.
+    """
+    import argparse
+    ap = argparse.ArgumentParser(prog="main.py batch", description="ProxyCardsTool headless batch mode")
+    ap.add_argument("--list", dest="lists", action="append", required=True, help="card list file (repeatable)")
+    ap.add_argument("--settings", help="settings JSON written by 'Save As' (defaults are used if omitted)")
+    ap.add_argument("--out", help="output folder (default: save_folder from the settings)")
+    ap.add_argument("--report", help="report JSON path (default: OUT/batch_report.json)")
+    ap.add_argument("--jobs", type=int, default=1, help="number of lists processed at the same time")
+    ap.add_argument("--trace", help="write a Chrome trace (JSON) of all lists to this file")
+    args = ap.parse_args(argv)
+
+    settings: dict = {}
+    if args.settings:
+        try:
+            with open(args.settings, "r", encoding="utf-8") as f: settings = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] cannot read settings {args.settings}: {e}"); return 2
+    out_root = args.out or settings.get("save_folder")
+    if not out_root:
+        print("[ERROR] no output folder: pass --out or set save_folder in the settings"); return 2
+    out_root = normalize_folder(out_root); os.makedirs(out_root, exist_ok=True)
+    # One folder per list, named after the file; lists with the same name (from different
+    # folders) get a numeric suffix so parallel lists never write into the same folder.
+    targets: List[str] = []; used = set()
+    for list_path in args.lists:
+        name = base = re.sub(r'[^A-Za-z0-9_-]+', '_', os.path.splitext(os.path.basename(list_path))[0]); n = 2
+        while name.lower() in used: name = f"{base}_{n}"; n += 1
+        used.add(name.lower()); targets.append(os.path.join(out_root, name) if len(args.lists) > 1 else out_root)
+
+    def run_one(list_path: str, target: str) -> dict:
+        tag = os.path.basename(target) if target != out_root else os.path.splitext(os.path.basename(list_path))[0]
+        try:
+            with open(list_path, "r", encoding="utf-8-sig") as f: lines = f.read().splitlines()
+        except Exception as e:
+            return {"list": list_path, "target_dir": target, "saved": [], "failed": [{"entry": list_path, "error": str(e)}]}
+        rep = process_list(lines, settings, target, pick_art=None,
+                           progress=lambda msg: print(f"[{tag}] {msg}"), run_stats=False)
+        rep["list"] = list_path
+        return rep
+
+    # Dedup, cache counters and the trace are shared by all lists: reported once for the batch.
+    t0 = time.time(); CACHE.reset_stats(); TRACE.begin(); RUN_FLIGHT.begin()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            reports = list(pool.map(run_one, args.lists, targets))
+        total = {"target_dir": out_root, "saved": [p for r in reports for p in r["saved"]],
+                 "failed": [f for r in reports for f in r["failed"]], "dedup_saved": RUN_FLIGHT.saved,
+                 "output": {"png_profile": next((r["output"]["png_profile"] for r in reports if r.get("output")), None),
+                            "files": sum(r["output"]["files"] for r in reports if r.get("output")),
+                            "bytes": sum(r["output"]["bytes"] for r in reports if r.get("output"))}}
+        add_run_stats(total)
+        trace_path = args.trace
+        if not trace_path and settings.get("write_trace"):
+            trace_path = os.path.join(out_root, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        if trace_path:
+            try: TRACE.write_chrome_trace(trace_path); total["trace"] = trace_path; print(f"[INFO] trace written to {trace_path}")
+            except Exception as e: print(f"[ERROR] cannot write trace {trace_path}: {e}")
+    finally:
+        RUN_FLIGHT.end(); TRACE.end()
+    ok = not total["failed"]
+    shared = {k: total[k] for k in ("dedup_saved", "cache", "timings", "output", "trace") if k in total}
+    summary = {"ok": ok, "elapsed_sec": round(time.time() - t0, 3), **shared, "lists": reports}
+    report_path = args.report or os.path.join(out_root, "batch_report.json")
+    try:
+        with open(report_path, "w", encoding="utf-8") as f: json.dump(summary, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"[ERROR] cannot write report {report_path}: {e}")
+    if len(reports) == 1:
+        print(f"--- {reports[0]['list']}\n{format_report(dict(reports[0], **shared))}")
+    else:
+        for r in reports: print(f"--- {r['list']}\n{format_report(r)}")
+        print(f"--- all lists\n{format_report(total)}")
+    return 0 if ok else 1
 
 def resource_path(rel: str) -> str:
     try:
@@ -566,6 +2592,14 @@ def _collect_settings_dict():
             "multiply": bool(multiply_var.get()),
             "choose_art": bool(choose_art_var.get()),
             "overwrite": bool(overwrite_var.get()),
+            "cache_enabled": bool(cache_var.get()),
+            "cache_max_mb": int(cache_mb_var.get() or CACHE_MAX_MB),
+            "parallel_lines": bool(parallel_var.get()),
+            "line_workers": int(workers_var.get() or LINE_WORKERS),
+            "render_workers": int(render_workers_var.get() or RENDER_WORKERS),
+            "write_trace": bool(trace_var.get()),
+            "png_profile": png_profile_var.get(),
+            "band_mb": int(band_mb_var.get() or BAND_MB),
         }
     except Exception:
         data = {}
@@ -585,12 +2619,19 @@ def _apply_settings_dict(data: dict) -> bool:
                          (margin_x_mm,"margin_x_mm"), (margin_y_mm,"margin_y_mm"),
                          (gap_x_mm,"gap_x_mm"), (gap_y_mm,"gap_y_mm"),
                          (crop_len_var,"crop_len_mm"), (crop_gap_var,"crop_gap_mm"),
-                         (border_px_var,"border_px"), (min_height_var,"min_height")]:
+                         (border_px_var,"border_px"), (min_height_var,"min_height"),
+                         (cache_mb_var,"cache_max_mb"),
+                         (workers_var,"line_workers"),
+                         (render_workers_var,"render_workers"),
+                         (band_mb_var,"band_mb")]:
             try: var.set(int(data.get(key, var.get())))
             except Exception: pass
         for var, key in [(crop_var,"crop_enabled"), (border_var,"border"),
                          (upscale_var,"upscale"), (multiply_var,"multiply"),
-                         (choose_art_var,"choose_art"), (overwrite_var,"overwrite")]:
+                         (choose_art_var,"choose_art"), (overwrite_var,"overwrite"),
+                         (cache_var,"cache_enabled"),
+                         (parallel_var,"parallel_lines"),
+                         (trace_var,"write_trace")]:
             try: var.set(bool(data.get(key, var.get())))
             except Exception: pass
         try: crop_stroke_px_var.set(int(data.get("crop_stroke_px", crop_stroke_px_var.get())))
@@ -599,6 +2640,8 @@ def _apply_settings_dict(data: dict) -> bool:
         except Exception: pass
         try: border_color_var.set(data.get("border_color", border_color_var.get()))
         except Exception: pass
+        try: png_profile_var.set(data.get("png_profile", png_profile_var.get()))
+        except Exception: pass
         return True
     except Exception:
         return False
@@ -630,6 +2673,15 @@ def load_settings_from_dialog():
     except Exception:
         return False
 def start_gui():
+    # The settings helpers above (_collect_settings_dict/_apply_settings_dict) live at module
+    # level, so the Tk variables they read are module globals.
+    global game_var, source_var, local_dir_var, folder_var, out_mode, a4_fmt, dpi_var
+    global card_w_mm, card_h_mm, margin_x_mm, margin_y_mm, gap_x_mm, gap_y_mm
+    global crop_var, crop_len_var, crop_gap_var, crop_stroke_px_var, crop_color_var
+    global border_var, border_px_var, border_color_var, upscale_var, min_height_var
+    global multiply_var, choose_art_var, overwrite_var, cache_var, cache_mb_var
+    global parallel_var, workers_var, render_workers_var, trace_var, png_profile_var, band_mb_var
+    global on_game_change
     root = Tk()
     selected_profile_var = StringVar(value="default")
     root.title("ProxyCardsTool (PCT)")
@@ -637,7 +2689,6 @@ def start_gui():
         root.iconbitmap(resource_path("app.ico"))
     except Exception:
         try:
-            from tkinter import PhotoImage
             root.iconphoto(True, PhotoImage(file=resource_path("app.ico")))
         except Exception: pass
     try:
@@ -686,6 +2737,46 @@ def start_gui():
     local_dir_var = StringVar(value=r"C:\User\Desktop\folder")
     Entry(source_box, textvariable=local_dir_var, width=36).grid(row=4, column=0, sticky="w")
     Button(source_box, text="Browse", width=6, command=lambda: local_dir_var.set(filedialog.askdirectory(initialdir=local_dir_var.get()))).grid(row=4, column=1, padx=(2,0), sticky="w")
+    def on_rebuild_index():
+        d = local_dir_var.get().strip()
+        if not d or not os.path.isdir(d):
+            messagebox.showerror("Error", "Please select an existing local folder!"); return
+        def work():
+            idx = local_index_for(d, rebuild=True)
+            return f"Local index: {idx.file_count} image(s), scanned in {idx.scan_sec:.2f} s"
+        run_in_background(work, "Rebuilding local index …")
+    Button(source_box, text="Rebuild index", command=on_rebuild_index).grid(row=5, column=0, sticky="w", pady=(2,0))
+
+    def run_in_background(work: Callable[[], str], busy_text: str):
+        """Run work() off the Tk thread; its return value (or error) ends up in the status line."""
+        box = {}
+        def target():
+            try: box["msg"] = work()
+            except Exception as e: box["msg"] = f"Error: {e}"
+        t = threading.Thread(target=target, daemon=True); t.start()
+        status_label.config(text=busy_text)
+        def poll():
+            if t.is_alive(): root.after(200, poll)
+            else: status_label.config(text=box.get("msg", ""))
+        root.after(200, poll)
+
+    def on_import_scryfall():
+        path = filedialog.askopenfilename(title="Scryfall bulk data (default_cards / all_cards)",
+                                          filetypes=[("Scryfall bulk JSON", "*.json *.json.gz"), ("All files", "*.*")])
+        if not path: return
+        def work():
+            t0 = time.time(); n = import_scryfall_bulk(path)
+            return f"MTG index: {n} prints imported in {time.time() - t0:.0f} s"
+        run_in_background(work, "Importing Scryfall bulk data …")
+    Button(source_box, text="MTG: import Scryfall bulk", command=on_import_scryfall).grid(row=5, column=0, sticky="w", padx=(90,0), pady=(2,0))
+
+    def on_update_ygo():
+        def work():
+            t0 = time.time(); kind, n = update_ygo_database()
+            if kind == "current": return "Yu-Gi-Oh! database is up to date."
+            return f"Yu-Gi-Oh! database: {n} cards ({kind}) in {time.time() - t0:.0f} s"
+        run_in_background(work, "Downloading Yu-Gi-Oh! card database …")
+    Button(source_box, text="YGO: update card database", command=on_update_ygo).grid(row=6, column=0, sticky="w", pady=(2,0))
 
     save_box = LabelFrame(right, text="Save folder", padx=lf_padx, pady=lf_pady, bd=1)
     save_box.grid(row=1, column=0, sticky="ew", **row_gap)
@@ -701,11 +2792,17 @@ def start_gui():
     Radiobutton(row_a4, text="Save A4 sheet 3×3", variable=out_mode, value="a4sheet", anchor="w").pack(side="left")
     Label(row_a4, text="Format:").pack(side="left", padx=(8,2))
     a4_fmt = StringVar(value="PDF")
-    OptionMenu(row_a4, a4_fmt, "PDF", "PNG", "JPG").pack(side="left")
+    OptionMenu(row_a4, a4_fmt, "PDF", "PDF (raster)", "PNG", "JPG").pack(side="left")
     dpi_row = Frame(out_box); dpi_row.grid(row=2, column=0, sticky="w", pady=(0,0))
     Label(dpi_row, text="DPI (applies to both):").pack(side="left")
     dpi_var = IntVar(value=1500)
     Entry(dpi_row, textvariable=dpi_var, width=5).pack(side="left", padx=(4,0))
+    Label(dpi_row, text="Render cores:").pack(side="left", padx=(8,2))
+    render_workers_var = IntVar(value=RENDER_WORKERS)
+    Entry(dpi_row, textvariable=render_workers_var, width=3).pack(side="left")
+    Label(dpi_row, text="Strip MB:").pack(side="left", padx=(8,2))
+    band_mb_var = IntVar(value=BAND_MB)
+    Entry(dpi_row, textvariable=band_mb_var, width=4).pack(side="left")
 
     a4_box = LabelFrame(right, text="A4 layout (mm)", padx=max(lf_padx-2,0), pady=0, bd=1)
     a4_box.grid(row=3, column=0, sticky="ew", **row_gap)
@@ -764,9 +2861,33 @@ def start_gui():
     Checkbutton(opt_box, text="Download cards multiply", variable=multiply_var).grid(row=0, column=0, sticky="w")
     Checkbutton(opt_box, text="I want to select picture art", variable=choose_art_var).grid(row=1, column=0, sticky="w")
     Checkbutton(opt_box, text="Overwrite existing files", variable=overwrite_var).grid(row=2, column=0, sticky="w")
+    cache_var = BooleanVar(value=True); cache_mb_var = IntVar(value=CACHE_MAX_MB)
+    row_c = Frame(opt_box); row_c.grid(row=3, column=0, sticky="w")
+    Checkbutton(row_c, text="Use download cache, max MB", variable=cache_var).pack(side="left")
+    Entry(row_c, textvariable=cache_mb_var, width=6).pack(side="left", padx=(4,4))
+    def on_clear_cache():
+        CACHE.clear(); status_label.config(text="Download cache cleared.")
+    Button(row_c, text="Clear", width=6, command=on_clear_cache).pack(side="left")
+    parallel_var = BooleanVar(value=True); workers_var = IntVar(value=LINE_WORKERS)
+    row_p = Frame(opt_box); row_p.grid(row=4, column=0, sticky="w")
+    Checkbutton(row_p, text="Process lines in parallel, workers", variable=parallel_var).pack(side="left")
+    Entry(row_p, textvariable=workers_var, width=4).pack(side="left", padx=(4,0))
+    trace_var = BooleanVar(value=False)
+    Checkbutton(opt_box, text="Write timing trace (trace_*.json)", variable=trace_var).grid(row=5, column=0, sticky="w")
+    png_profile_var = StringVar(value=DEFAULT_PNG_PROFILE)
+    row_e = Frame(opt_box); row_e.grid(row=6, column=0, sticky="w")
+    Label(row_e, text="PNG encoding:").pack(side="left")
+    OptionMenu(row_e, png_profile_var, *PNG_PROFILES).pack(side="left", padx=(4,4))
+    Label(row_e, text="fast = quickest, larger files · smallest = slowest", fg="#555").pack(side="left")
 
     status_label = Label(right, text="", fg="#007a33"); status_label.grid(row=6, column=0, sticky="w", pady=(1,2))
-    Button(right, text="Download List", command=lambda: on_download(), width=30).grid(row=7, column=0, sticky="ew")
+    download_btn = Button(right, text="Download List", command=lambda: on_download(), width=30)
+    download_btn.grid(row=7, column=0, sticky="ew")
+    job_box = Frame(right); job_box.grid(row=8, column=0, sticky="ew", pady=(2,0))
+    pause_btn = Button(job_box, text="Pause", width=10, state=DISABLED, command=lambda: on_pause())
+    pause_btn.pack(side="left", padx=(0,4))
+    cancel_btn = Button(job_box, text="Cancel", width=10, state=DISABLED, command=lambda: on_cancel())
+    cancel_btn.pack(side="left")
     # --- settings persistence (moved above first call) ---
     SETTINGS_FILE = os.path.join(os.path.expanduser("~"), "mg_pcm_settings.json")
 
@@ -852,6 +2973,14 @@ def start_gui():
                 "multiply": bool(multiply_var.get()),
                 "choose_art": bool(choose_art_var.get()),
                 "overwrite": bool(overwrite_var.get()),
+                "cache_enabled": bool(cache_var.get()),
+                "cache_max_mb": int(cache_mb_var.get() or CACHE_MAX_MB),
+                "parallel_lines": bool(parallel_var.get()),
+                "line_workers": int(workers_var.get() or LINE_WORKERS),
+                "render_workers": int(render_workers_var.get() or RENDER_WORKERS),
+                "write_trace": bool(trace_var.get()),
+                "png_profile": png_profile_var.get(),
+                "band_mb": int(band_mb_var.get() or BAND_MB),
             }
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
@@ -889,12 +3018,19 @@ def start_gui():
                              (margin_x_mm,"margin_x_mm"), (margin_y_mm,"margin_y_mm"),
                              (gap_x_mm,"gap_x_mm"), (gap_y_mm,"gap_y_mm"),
                              (crop_len_var,"crop_len_mm"), (crop_gap_var,"crop_gap_mm"),
-                             (border_px_var,"border_px"), (min_height_var,"min_height")]:
+                             (border_px_var,"border_px"), (min_height_var,"min_height"),
+                             (cache_mb_var,"cache_max_mb"),
+                             (workers_var,"line_workers"),
+                             (render_workers_var,"render_workers"),
+                             (band_mb_var,"band_mb")]:
                 try: var.set(int(data.get(key, var.get())))
                 except Exception: pass
             for var, key in [(crop_var,"crop_enabled"), (border_var,"border"),
                              (upscale_var,"upscale"), (multiply_var,"multiply"),
-                             (choose_art_var,"choose_art"), (overwrite_var,"overwrite")]:
+                             (choose_art_var,"choose_art"), (overwrite_var,"overwrite"),
+                             (cache_var,"cache_enabled"),
+                             (parallel_var,"parallel_lines"),
+                             (trace_var,"write_trace")]:
                 try: var.set(bool(data.get(key, var.get())))
                 except Exception: pass
             try: crop_stroke_px_var.set(int(data.get("crop_stroke_px", crop_stroke_px_var.get())))
@@ -903,6 +3039,8 @@ def start_gui():
             except Exception: pass
             try: border_color_var.set(data.get("border_color", border_color_var.get()))
             except Exception: pass
+            try: png_profile_var.set(data.get("png_profile", png_profile_var.get()))
+            except Exception: pass
             _save_last_profile(profile_name)
             return True
         except Exception:
@@ -994,6 +3132,14 @@ def start_gui():
                 "multiply": bool(multiply_var.get()),
                 "choose_art": bool(choose_art_var.get()),
                 "overwrite": bool(overwrite_var.get()),
+                "cache_enabled": bool(cache_var.get()),
+                "cache_max_mb": int(cache_mb_var.get() or CACHE_MAX_MB),
+                "parallel_lines": bool(parallel_var.get()),
+                "line_workers": int(workers_var.get() or LINE_WORKERS),
+                "render_workers": int(render_workers_var.get() or RENDER_WORKERS),
+                "write_trace": bool(trace_var.get()),
+                "png_profile": png_profile_var.get(),
+                "band_mb": int(band_mb_var.get() or BAND_MB),
             }
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
@@ -1031,12 +3177,19 @@ def start_gui():
                              (margin_x_mm,"margin_x_mm"), (margin_y_mm,"margin_y_mm"),
                              (gap_x_mm,"gap_x_mm"), (gap_y_mm,"gap_y_mm"),
                              (crop_len_var,"crop_len_mm"), (crop_gap_var,"crop_gap_mm"),
-                             (border_px_var,"border_px"), (min_height_var,"min_height")]:
+                             (border_px_var,"border_px"), (min_height_var,"min_height"),
+                             (cache_mb_var,"cache_max_mb"),
+                             (workers_var,"line_workers"),
+                             (render_workers_var,"render_workers"),
+                             (band_mb_var,"band_mb")]:
                 try: var.set(int(data.get(key, var.get())))
                 except Exception: pass
             for var, key in [(crop_var,"crop_enabled"), (border_var,"border"),
                              (upscale_var,"upscale"), (multiply_var,"multiply"),
-                             (choose_art_var,"choose_art"), (overwrite_var,"overwrite")]:
+                             (choose_art_var,"choose_art"), (overwrite_var,"overwrite"),
+                             (cache_var,"cache_enabled"),
+                             (parallel_var,"parallel_lines"),
+                             (trace_var,"write_trace")]:
                 try: var.set(bool(data.get(key, var.get())))
                 except Exception: pass
             try: crop_stroke_px_var.set(int(data.get("crop_stroke_px", crop_stroke_px_var.get())))
@@ -1045,6 +3198,8 @@ def start_gui():
             except Exception: pass
             try: border_color_var.set(data.get("border_color", border_color_var.get()))
             except Exception: pass
+            try: png_profile_var.set(data.get("png_profile", png_profile_var.get()))
+            except Exception: pass
             _save_last_profile(profile_name)
             return True
         except Exception:
@@ -1064,6 +3219,7 @@ def start_gui():
 
 
     def _on_close():
+        if job["control"]: job["control"].cancel()
         try: save_settings_to_file()
         finally: root.destroy()
     root.protocol("WM_DELETE_WINDOW", _on_close)
@@ -1095,116 +3251,76 @@ def start_gui():
     except Exception: _big = None
     Label(left, text="SEARCH IN ONLINE SOURCES\nIN ENGLISH CARD-NAMES FOR BEST RESULTS", font=_big, fg="#333").grid(row=2, column=0, sticky="nw", pady=(6,0))
 
-    def normalize_folder(p: str) -> str:
-        p = p.strip().strip('"').strip("'")
-        return os.path.normpath(os.path.abspath(p))
+    # Downloads run in a background thread; progress, art-picker requests and the result
+    # come back through a queue that the Tk loop polls, so the window stays responsive.
+    job = {"control": None}
+
+    def on_pause():
+        c = job["control"]
+        if not c: return
+        if c.paused: c.resume(); pause_btn.config(text="Pause")
+        else: c.pause(); pause_btn.config(text="Resume")
 
-    def ensure_unique(path: str) -> str:
-        if overwrite_var.get(): return path
-        base, ext = os.path.splitext(path); candidate = path; n = 1
-        while os.path.exists(candidate): candidate = f"{base} ({n}){ext}"; n += 1
-        return candidate
+    def on_cancel():
+        c = job["control"]
+        if c: c.cancel(); cancel_btn.config(state=DISABLED); status_label.config(text="Cancelling …")
 
     def on_download():
+        if job["control"]: return
         lines = text_box.get("1.0", END).strip().splitlines()
         if not lines:
             messagebox.showerror("Error", "Please enter a list!"); return
         save_dir_raw = folder_var.get().strip()
         if not save_dir_raw:
             messagebox.showerror("Error", "Please select a save folder!"); return
-        target_dir = normalize_folder(save_dir_raw); os.makedirs(target_dir, exist_ok=True)
-
-        success, failed = [], []
-        total = len([ln for ln in lines if ln.strip()])
-        src = source_var.get()
-        game = game_var.get()
-        local_dir = normalize_folder(local_dir_var.get()) if src == "local" else None
-        collected_for_a4: List[bytes] = []
-        first_title_for_sheet: Optional[str] = None
-
-        for idx, line in enumerate(lines, start=1):
-            txt = line.strip()
-            if not txt: continue
-            m = re.match(r'\s*(\d+)\s*(?:[x×]\s*)?(.+?)\s*$', txt, re.I)
-            if m: qty = int(m.group(1)); term = m.group(2).strip()
-            else: qty = 1; term = txt
-
-            display = term
-            if game == "One Piece" and looks_like_op_code(term): display = term.upper()
-            if not first_title_for_sheet: first_title_for_sheet = display
-            effective_qty = qty if multiply_var.get() else 1
-            status_label.config(text=f"Processing {idx}/{total}: {display} …"); right.update_idletasks()
-
+        target_dir = normalize_folder(save_dir_raw)
+        settings = _collect_settings_dict()
+        if not settings:
+            messagebox.showerror("Error", "Please check the number fields (DPI, mm, px …)!"); return
+        CACHE.reset_stats()
+
+        control = JobControl(); job["control"] = control
+        events: "queue.Queue[tuple]" = queue.Queue(); bytes0 = ENGINE.bytes_in; last = {"text": ""}
+        def pick(display: str, cands: List[ArtCandidate]) -> Optional[bytes]:
+            reply: Future = Future(); events.put(("pick", display, cands, reply)); return reply.result()
+        def work():
             try:
-                if choose_art_var.get():
-                    variants = probe_all_arts(game, term, src, local_dir)
-                    if not variants:
-                        raise RuntimeError(f"No images found for {display}.\n(Hint: OP needs codes; others use names.)")
-                    chosen = variants[0][1] if len(variants) == 1 else (pick_art_popup(root, display, variants) or None)
-                    if chosen is None: continue
-                    img_bytes = chosen
-                else:
-                    img_bytes = download_card_default(game, term, src, local_dir)
+                events.put(("done", process_list(lines, settings, target_dir, pick_art=pick,
+                                                 progress=lambda text: events.put(("status", text)),
+                                                 control=control)))
+            except Exception as e:
+                events.put(("error", e))
+        download_btn.config(state=DISABLED); pause_btn.config(state=NORMAL, text="Pause"); cancel_btn.config(state=NORMAL)
+        threading.Thread(target=work, name="download-job", daemon=True).start()
 
-                if out_mode.get() == "images":
-                    for i in range(effective_qty):
-                        base = f"{display}_{i+1}" if effective_qty > 1 else display
-                        safe = re.sub(r'[^A-Za-z0-9_-]+', '_', base)[:60]
-                        out_file = ensure_unique(os.path.join(target_dir, f"{safe}.png"))
-                        save_png(img_bytes, out_file,
-                                 add_border=border_var.get(),
-                                 border_px=max(0, int(border_px_var.get())), border_color=border_color_var.get(),
-                                 do_upscale=upscale_var.get(),
-                                 min_height_px=max(1, int(min_height_var.get())),
-                                 dpi=max(72, int(dpi_var.get())))
-                        success.append(out_file)
-                else:
-                    for _ in range(effective_qty): collected_for_a4.append(img_bytes)
+        def finish():
+            job["control"] = None
+            download_btn.config(state=NORMAL); pause_btn.config(state=DISABLED, text="Pause"); cancel_btn.config(state=DISABLED)
 
-            except Exception as e:
-                failed.append(f"{qty}x{display}"); print(f"[ERROR] {display}: {e}")
-
-        if out_mode.get() == "a4sheet" and collected_for_a4:
-            dpi = max(72, int(dpi_var.get()))
-            def _crop_color_rgb(name: str):
-                return {
-                    "Black": (0,0,0),
-                    "Red": (230,0,0),
-                    "Green": (0,170,0),
-                    "Blue": (30,90,255),
-                }.get(name, (0,0,0))
-            pages = build_a4_pages(collected_for_a4, dpi=dpi,
-                card_w_mm=float(card_w_mm.get()), card_h_mm=float(card_h_mm.get()),
-                margin_x_mm=float(margin_x_mm.get()), margin_y_mm=float(margin_y_mm.get()),
-                gap_x_mm=float(gap_x_mm.get()), gap_y_mm=float(gap_y_mm.get()),
-                crop_marks=bool(crop_var.get()),
-                crop_len_mm=float(crop_len_var.get()), crop_gap_mm=float(crop_gap_var.get()),
-                crop_stroke_px=int(crop_stroke_px_var.get()), crop_color=_crop_color_rgb(crop_color_var.get()),
-                add_border=border_var.get(), border_px=int(border_px_var.get()), border_color=border_color_var.get()
-            )
-            if pages:
-                base_name = re.sub(r'[^A-Za-z0-9_-]+', '_', first_title_for_sheet or "sheet")
-                fmt = a4_fmt.get().upper()
-                if fmt == "PDF":
-                    path = next_unique(target_dir, f"A4_{base_name}", ".pdf")
-                    first, rest = pages[0].convert("RGB"), [p.convert("RGB") for p in pages[1:]]
-                    first.save(path, "PDF", resolution=dpi, save_all=True, append_images=rest)
-                    success.append(path)
-                else:
-                    for i, p in enumerate(pages, 1):
-                        ext = ".png" if fmt == "PNG" else ".jpg"
-                        path = next_unique(target_dir, f"A4_{base_name}_{i:03d}", ext)
-                        if fmt == "PNG": p.save(path, "PNG", optimize=True)
-                        else: p.save(path, "JPEG", quality=95, subsampling=0, optimize=True)
-                        success.append(path)
-
-        status_label.config(text="Download finished.")
-        msg = f"{len(success)} file(s) saved in:\n{target_dir}"
-        if failed: msg += f"\nFailed: {', '.join(failed)}"
-        messagebox.showinfo("Done", msg)
-
-    def pick_art_popup(root_win: Tk, title_text: str, found_images: List[Tuple[str, bytes]]) -> Optional[bytes]:
-        if not found_images: return None
+        def poll():
+            try:
+                while True:
+                    ev = events.get_nowait()
+                    if ev[0] == "status": last["text"] = ev[1]
+                    elif ev[0] == "pick":
+                        try: ev[3].set_result(None if control.cancelled else pick_art_popup(root, ev[1], ev[2]))
+                        except Exception: ev[3].set_result(None)
+                    elif ev[0] == "done":
+                        finish(); status_label.config(text="Download cancelled." if ev[1].get("cancelled") else "Download finished.")
+                        messagebox.showinfo("Done", format_report(ev[1])); return
+                    else:
+                        finish(); status_label.config(text="Download failed.")
+                        messagebox.showerror("Error", str(ev[1])); return
+            except queue.Empty: pass
+            rate = control.done / control.active_sec(); mb = (ENGINE.bytes_in - bytes0) / 1048576
+            eta = f"{(control.total - control.done) / rate:.0f} s" if rate > 0 and control.done < control.total else "–"
+            state = "Paused – " if control.paused else ""
+            status_label.config(text=f"{state}{last['text']}  |  {rate:.2f} cards/s, {mb:.1f} MB, ETA {eta}")
+            root.after(150, poll)
+        poll()
+
+    def pick_art_popup(root_win: Tk, title_text: str, candidates: List[ArtCandidate]) -> Optional[bytes]:
+        if not candidates: return None
         win = Toplevel(root_win); win.title(f"Select art for {title_text}")
         try: win.iconbitmap(resource_path("app.ico"))
         except Exception: pass
@@ -1243,23 +3359,71 @@ def start_gui():
             win.bind_all("<Button-5>", _on_mousewheel)
         except Exception: pass
 
-        thumbs: List[ImageTk.PhotoImage] = []; chosen = {"data": None}
-        for idx, (url, data) in enumerate(found_images):
-            try: tkimg = make_padded_thumb(data, THUMB_W, THUMB_H)
-            except Exception: continue
-            thumbs.append(tkimg)
+        info = Label(win, text="Loading previews … double-click an art to use it.", anchor="w")
+        info.grid(row=1, column=0, columnspan=2, sticky="ew", padx=6, pady=(2,4))
+
+        # Previews (small images published by the source) are downloaded and decoded in worker
+        # threads and added as they arrive; the Tk thread only wraps the finished thumbnails.
+        # Only the double-clicked art is downloaded at full resolution.
+        thumbs: List[ImageTk.PhotoImage] = []; chosen = {"data": None}; busy = {"on": False}
+        labels: List[Label] = []; cells: List[Frame] = []; hidden = set()
+        arrived: "queue.Queue[Tuple[int, Optional[PILImage.Image], Optional[int]]]" = queue.Queue()
+        blank = PhotoImage(width=THUMB_W, height=THUMB_H)
+
+        def on_dbl(_e, cand: ArtCandidate):
+            if busy["on"]: return
+            busy["on"] = True; info.config(text="Loading full image …")
+            fut: Future = Future()
+            def load_full():
+                try: fut.set_result(cand.data)
+                except Exception: fut.set_result(None)
+            threading.Thread(target=load_full, daemon=True).start()
+            def poll():
+                if not win.winfo_exists(): return
+                if not fut.done(): win.after(50, poll); return
+                busy["on"] = False
+                if fut.result(): chosen["data"] = fut.result(); win.destroy()
+                else: info.config(text="This art could not be downloaded – please pick another one.")
+            poll()
+
+        for idx, cand in enumerate(candidates):
             r, c = divmod(idx, THUMB_COLS)
             cell = Frame(frame, bd=1, relief="groove", width=THUMB_W+8, height=THUMB_H+38, highlightthickness=0)
             cell.grid(row=r, column=c, padx=6, pady=6, sticky="n"); cell.grid_propagate(False)
-            lbl = Label(cell, image=tkimg); lbl.image = tkimg; lbl.pack(padx=3, pady=2)
-            label_text = url if os.path.isabs(url) else url.rsplit("/", 1)[-1]
+            lbl = Label(cell, image=blank, text="…", compound="center"); lbl.pack(padx=3, pady=2)
+            label_text = cand.url if cand.is_local else cand.url.rsplit("/", 1)[-1]
             cap = Label(cell, text=os.path.basename(label_text)); cap.pack(padx=2, pady=(0,2))
-            def on_dbl(_e, b=data): chosen["data"] = b; win.destroy()
-            lbl.bind("<Double-Button-1>", on_dbl); cell.bind("<Double-Button-1>", on_dbl)
+            lbl.bind("<Double-Button-1>", lambda e, c=cand: on_dbl(e, c)); cell.bind("<Double-Button-1>", lambda e, c=cand: on_dbl(e, c))
+            labels.append(lbl); cells.append(cell)
+
+        def hide(i: int):
+            # Same picture as an earlier art: drop the cell and close the gap it leaves.
+            hidden.add(i); cells[i].grid_remove()
+            for n, k in enumerate(k for k in range(len(cells)) if k not in hidden):
+                r, c = divmod(n, THUMB_COLS); cells[k].grid(row=r, column=c)
+
+        loader = load_previews(candidates, lambda i, pil, drop: arrived.put((i, pil, drop)),
+                               lambda b: render_padded_thumb(b, THUMB_W, THUMB_H))
+        pending = {"n": len(candidates)}
+        def drain():
+            if not win.winfo_exists(): return
+            try:
+                while True:
+                    i, pil, drop = arrived.get_nowait(); pending["n"] -= 1
+                    if drop is not None: hide(drop)
+                    if drop == i: continue
+                    tkimg = ImageTk.PhotoImage(pil) if pil is not None else None
+                    if tkimg is None: labels[i].config(text="not available"); continue
+                    thumbs.append(tkimg); labels[i].config(image=tkimg, text=""); labels[i].image = tkimg
+            except queue.Empty: pass
+            if pending["n"] == 0 and not busy["on"]: info.config(text="Double-click an art to use it.")
+            if pending["n"] > 0: win.after(40, drain)
+        win.after(0, drain)
 
         frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
         canvas.bind("<Configure>", lambda e: canvas.itemconfig(inner, width=e.width))
         win.transient(root_win); win.grab_set(); root.wait_window(win)
+        loader.shutdown(wait=False, cancel_futures=True)
         return chosen["data"]
 
     # Settings (left bottom)
@@ -1279,5 +3443,14 @@ def start_gui():
 
     root.mainloop()
 if __name__ == "__main__":
+    import multiprocessing; multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "update-ygo":
+        kind, n = update_ygo_database(full="--full" in sys.argv[2:])
+        print(f"Yu-Gi-Oh! database: {kind}, {n} card(s) written."); sys.exit(0)
+    if len(sys.argv) > 2 and sys.argv[1] == "import-scryfall":
+        print(f"{import_scryfall_bulk(sys.argv[2], progress=lambda n: print(f'{n} cards …'))} prints imported.")
+        sys.exit(0)
     print("Launching GUI…")
     start_gui()